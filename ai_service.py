@@ -1,21 +1,216 @@
-from groq import Groq
 from dotenv import load_dotenv
+import asyncio
+import copy
+import functools
+import hashlib
+import inspect
+import json
 import os
+import re
+from cachetools import TTLCache
 from competitor_analyzer import analyze_competitor_site
+from llm_client import create_completion, create_transcription, MODEL
 from typing import Optional, List
 
 load_dotenv()
 
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-MODEL = os.getenv("GROQ_MODEL")
+_HEX_RE = re.compile(r'#(?:[0-9a-fA-F]{3}){1,2}\b')
+_WS_RE = re.compile(r'\s+')
+_JSON_OBJECT_RE = re.compile(r'\{[\s\S]*\}')
+# One list line: leading numbering/bullets dropped, lines starting with a
+# brace (stray JSON) skipped
+_TAGLINE_RE = re.compile(r'^(?![ \t]*[{}])[\d•\-*. \t]*([^\d•\-*.\s].*?)[ \t\r]*$', re.M)
+
+# ========== STATIC SYSTEM PREAMBLES ==========
+# Kept byte-identical across calls so the provider can reuse the cached
+# prefix; only the per-request details go in the user message.
+BRAND_NAMES_SYSTEM = """You are BizForge, an expert brand naming consultant.
+Generate 10 unique brand names for the brief you are given.
+Return only a numbered list."""
+
+MARKETING_CONTENT_SYSTEM = """You are BizForge, an expert marketing copywriter.
+Generate high-quality, professional marketing content."""
+
+SENTIMENT_SYSTEM = """You are a branding sentiment analyst.
+Analyze the sentiment of the text you are given and consider its alignment with the brand tone.
+
+Return:
+- Sentiment (Positive / Neutral / Negative)
+- Confidence score (0-100%)
+- Short explanation"""
+
+CHAT_SYSTEM = """You are BizForge, an expert branding consultant.
+Provide strategic, actionable, professional branding advice."""
+
+LOGO_PROMPT_SYSTEM = """You are a professional brand identity designer.
+Create a detailed, high-quality logo design prompt.
+
+Include:
+- Visual style
+- Color suggestions
+- Typography style
+- Symbol concepts
+- Emotional tone
+- Background style
+
+Write it as a ready-to-use prompt for an AI image generator."""
+
+COLOR_PALETTE_SYSTEM = """You are a professional brand identity designer.
+Generate a cohesive brand color palette.
+
+Provide:
+- 5 HEX color codes
+- Short explanation for each color
+- Suggested primary and secondary color
+
+Format clearly."""
+
+TAGLINE_SYSTEM = """You are BizForge, an expert brand copywriter.
+Generate 5 unique, powerful taglines for the brand you are given.
+
+IMPORTANT: Return your response as a JSON object with this exact structure:
+{
+    "taglines": [
+        "First tagline here",
+        "Second tagline here",
+        "Third tagline here",
+        "Fourth tagline here",
+        "Fifth tagline here"
+    ]
+}
+
+Example format:
+{
+    "taglines": [
+        "Innovate Without Limits",
+        "Future Ready, Today",
+        "Think Forward, Move Fast",
+        "Where Ideas Take Flight",
+        "Building Tomorrow Together"
+    ]
+}
+
+Return ONLY the JSON object, no other text or formatting."""
+
+PRODUCT_DESCRIPTION_SYSTEM = """You are BizForge, an expert marketing copywriter.
+Write a product description for the brand and product you are given."""
+
+SOCIAL_POST_SYSTEM = """You are BizForge, an expert social media copywriter.
+Create a post for the platform, brand and topic you are given."""
+
+EMAIL_SYSTEM = """You are BizForge, an expert email marketing copywriter.
+Write an email of the type, brand and topic you are given."""
+
+SUMMARIZE_SYSTEM = """You are BizForge, an expert brand copywriter.
+Summarize the text you are given in the brand's tone."""
+
+BRAND_BUNDLE_SYSTEM = """You are a professional brand identity designer.
+
+Return STRICT JSON with exactly these keys:
+- names: array of brand names
+- taglines: array of 5 unique, powerful taglines
+- palette: object with hex_codes (array of 5 HEX color codes), primary (HEX),
+  secondary (HEX) and description (short explanation for each color)
+- logo_prompt: a detailed, ready-to-use prompt for an AI image generator
+  covering visual style, colors, typography, symbol concepts, emotional tone
+  and background style
+
+Only when the request asks for them, also include:
+- product_description: a product description for the given product
+- social_post: a post for the given platform and topic
+- email: an email of the given type and topic
+
+Return ONLY the JSON object, no other text."""
+
+COMPETITOR_ANALYSIS_SYSTEM = """You are a competitive brand strategist.
+You are given structured data scraped from a competitor website.
+
+Provide:
+- Competitor positioning summary
+- Core products/services offered
+- Messaging style analysis
+- Color psychology interpretation
+- CTA strategy analysis
+- What strategic elements are strong
+- What could be copied or improved
+
+Be analytical and structured."""
+
+# ========== GENERATION CACHE ==========
+GENERATION_CACHE_SIZE = 1024
+GENERATION_CACHE_TTL = 1800  # seconds
+
+# Short descriptor arguments whose case and spacing don't change the answer;
+# everything else (names, free-text messages, topics) is keyed verbatim
+_NORMALIZED_ARGS = frozenset({"industry", "tone", "keywords"})
+
+
+def _normalize_cache_arg(name, value):
+    """
+    Folds descriptor inputs that would get the same answer onto one cache
+    key: case and runs of whitespace are ignored, and comma-separated
+    keywords are treated as an unordered set.
+    """
+    if not isinstance(value, str) or name not in _NORMALIZED_ARGS:
+        return value
+    value = _WS_RE.sub(" ", value).strip().casefold()
+    if name == "keywords":
+        value = ",".join(sorted({k.strip() for k in value.split(",") if k.strip()}))
+    return value
+
+
+def _memoize_generation(fn):
+    """
+    Caches a generator's result by its normalized arguments for
+    GENERATION_CACHE_TTL. Calls that pass exclude or feedback ask for
+    something new, so they always go to the model.
+    """
+    cache = TTLCache(maxsize=GENERATION_CACHE_SIZE, ttl=GENERATION_CACHE_TTL)
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = bound.arguments
+
+        if arguments.get("exclude") or arguments.get("feedback"):
+            return await fn(*args, **kwargs)
+
+        normalized = {name: _normalize_cache_arg(name, value) for name, value in arguments.items()}
+        key = hashlib.blake2b(
+            json.dumps(normalized, sort_keys=True, default=str).encode("utf-8"),
+            digest_size=16
+        ).digest()
+
+        if key not in cache:
+            cache[key] = await fn(*args, **kwargs)
+
+        # Callers may mutate the result; keep the cached copy pristine
+        return copy.deepcopy(cache[key])
+
+    wrapper.cache = cache
+    return wrapper
+
+def _parse_name_line(line: str) -> Optional[str]:
+    line = line.strip()
+    if line and "." in line:
+        return line.split(".", 1)[1].strip()
+    return None
+
 
-def generate_brand_names(
+async def stream_brand_names(
     industry: str,
     keywords: str,
     tone: str,
     exclude: Optional[List[str]] = None,
     feedback: Optional[str] = None
-) -> List[str]:
+):
+    """
+    Streams the completion and yields each brand name as soon as its
+    line is complete, so callers can show the first names before the
+    whole list has been generated.
+    """
     exclude_text = ""
     if exclude:
         exclude_text = f"\nDo NOT generate these names again: {exclude}"
@@ -25,32 +220,50 @@ def generate_brand_names(
         feedback_text = f"\nUser requested changes: {feedback}\nPlease incorporate this feedback in your new suggestions."
 
     prompt = f"""
-    Generate 10 unique brand names.
-
     Industry: {industry}
     Keywords: {keywords}
     Tone: {tone}
 
     {exclude_text}
     {feedback_text}
-
-    Return only a numbered list.
     """
 
-    response = client.chat.completions.create(
+    response = await create_completion(
         model=MODEL,
-        messages=[{"role": "user", "content": prompt}]
+        messages=[
+            {"role": "system", "content": BRAND_NAMES_SYSTEM},
+            {"role": "user", "content": prompt}
+        ],
+        stream=True
     )
 
-    raw_output = response.choices[0].message.content
+    buffer = ""
+    async for chunk in response:
+        if not chunk.choices:
+            continue
+        buffer += chunk.choices[0].delta.content or ""
+        while "\n" in buffer:
+            line, buffer = buffer.split("\n", 1)
+            name = _parse_name_line(line)
+            if name:
+                yield name
 
-    lines = raw_output.split("\n")
-    clean_names = []
+    name = _parse_name_line(buffer)
+    if name:
+        yield name
 
-    for line in lines:
-        line = line.strip()
-        if line and "." in line:
-            clean_names.append(line.split(".", 1)[1].strip())
+
+@_memoize_generation
+async def generate_brand_names(
+    industry: str,
+    keywords: str,
+    tone: str,
+    exclude: Optional[List[str]] = None,
+    feedback: Optional[str] = None
+) -> List[str]:
+    clean_names = [
+        name async for name in stream_brand_names(industry, keywords, tone, exclude, feedback)
+    ]
 
     # Remove duplicates within the same response
     clean_names = list(dict.fromkeys(clean_names))
@@ -58,44 +271,38 @@ def generate_brand_names(
     return clean_names
 
 
-def generate_marketing_content(brand_description: str, tone: str, content_type: str):
+async def generate_marketing_content(brand_description: str, tone: str, content_type: str):
     prompt = f"""
-    You are BizForge, an expert marketing copywriter.
-
     Brand Description: {brand_description}
     Tone: {tone}
     Content Type: {content_type}
-
-    Generate high-quality, professional marketing content.
     """
 
-    response = client.chat.completions.create(
+    response = await create_completion(
         model=MODEL,
-        messages=[{"role": "user", "content": prompt}]
+        messages=[
+            {"role": "system", "content": MARKETING_CONTENT_SYSTEM},
+            {"role": "user", "content": prompt}
+        ]
     )
 
     return response.choices[0].message.content
 
 
-def analyze_sentiment(text: str, brand_tone: str):
+async def analyze_sentiment(text: str, brand_tone: str):
     prompt = f"""
-    You are a branding sentiment analyst.
-
-    Analyze the sentiment of the following text.
-    Consider alignment with brand tone: {brand_tone}
+    Brand tone: {brand_tone}
 
     Text:
     {text}
-
-    Return:
-    - Sentiment (Positive / Neutral / Negative)
-    - Confidence score (0-100%)
-    - Short explanation
     """
 
-    response = client.chat.completions.create(
+    response = await create_completion(
         model=MODEL,
-        messages=[{"role": "user", "content": prompt}]
+        messages=[
+            {"role": "system", "content": SENTIMENT_SYSTEM},
+            {"role": "user", "content": prompt}
+        ]
     )
 
     return response.choices[0].message.content
@@ -105,24 +312,22 @@ import requests
 HF_API_KEY = os.getenv("HF_API_KEY")
 IBM_MODEL = os.getenv("IBM_MODEL")
 
-def chat_with_ai(user_message: str):
-    prompt = f"""
-    You are BizForge, an expert branding consultant.
-
-    Provide strategic, actionable, professional branding advice.
-
-    User Question:
-    {user_message}
-    """
-
-    response = client.chat.completions.create(
+@_memoize_generation
+async def chat_with_ai(user_message: str):
+    # Deterministic sampling so identical questions can be served from cache
+    response = await create_completion(
         model=MODEL,
-        messages=[{"role": "user", "content": prompt}]
+        temperature=0,
+        messages=[
+            {"role": "system", "content": CHAT_SYSTEM},
+            {"role": "user", "content": user_message}
+        ]
     )
 
     return response.choices[0].message.content
 
-def generate_logo_prompt(
+@_memoize_generation
+async def generate_logo_prompt(
     brand_name: str,
     industry: str,
     keywords: str,
@@ -138,31 +343,20 @@ def generate_logo_prompt(
         feedback_text = f"\nUser requested changes: {feedback}\nPlease incorporate this feedback."
 
     prompt = f"""
-    You are a professional brand identity designer.
-
-    Create a detailed, high-quality logo design prompt.
-
     Brand Name: {brand_name}
     Industry: {industry}
     Core Keywords: {keywords}
 
     {exclude_text}
     {feedback_text}
-
-    Include:
-    - Visual style
-    - Color suggestions
-    - Typography style
-    - Symbol concepts
-    - Emotional tone
-    - Background style
-
-    Write it as a ready-to-use prompt for an AI image generator.
     """
 
-    response = client.chat.completions.create(
+    response = await create_completion(
         model=MODEL,
-        messages=[{"role": "user", "content": prompt}]
+        messages=[
+            {"role": "system", "content": LOGO_PROMPT_SYSTEM},
+            {"role": "user", "content": prompt}
+        ]
     )
 
     return response.choices[0].message.content
@@ -173,7 +367,11 @@ import base64
 
 SDXL_MODEL = os.getenv("SDXL_MODEL")
 
-def generate_logo_image(prompt: str):
+# Reused across logo requests so the HF router connection stays warm
+_HF_SESSION = requests.Session()
+
+def generate_logo_image_bytes(prompt: str) -> bytes:
+    """Returns the raw PNG bytes; raises requests.HTTPError on failure."""
     url = f"https://router.huggingface.co/hf-inference/models/{SDXL_MODEL}"
 
     headers = {
@@ -185,18 +383,22 @@ def generate_logo_image(prompt: str):
         "inputs": prompt
     }
 
-    response = requests.post(url, headers=headers, json=payload)
+    response = _HF_SESSION.post(url, headers=headers, json=payload, stream=True, timeout=60)
+    response.raise_for_status()
 
-    if response.status_code != 200:
-        return f"Error: {response.text}"
+    return response.raw.read(decode_content=True)
 
-    # Convert image bytes to base64 so FastAPI can return it
-    image_bytes = response.content
-    encoded_image = base64.b64encode(image_bytes).decode("utf-8")
+def generate_logo_image(prompt: str):
+    """Base64 variant for JSON consumers; returns an "Error: ..." string on failure."""
+    try:
+        image_bytes = generate_logo_image_bytes(prompt)
+    except requests.HTTPError as e:
+        return f"Error: {e.response.text}"
 
-    return encoded_image
+    return base64.b64encode(image_bytes).decode("utf-8")
 
-def get_color_palette(
+@_memoize_generation
+async def get_color_palette(
     tone: str,
     industry: str,
     brand_name: Optional[str] = None,
@@ -214,35 +416,26 @@ def get_color_palette(
     brand_context = f"Brand Name: {brand_name}" if brand_name else ""
 
     prompt = f"""
-    You are a professional brand identity designer.
-
-    Generate a cohesive brand color palette.
-
     Industry: {industry}
     Brand Tone: {tone}
     {brand_context}
 
     {exclude_text}
     {feedback_text}
-
-    Provide:
-    - 5 HEX color codes
-    - Short explanation for each color
-    - Suggested primary and secondary color
-
-    Format clearly.
     """
 
-    response = client.chat.completions.create(
+    response = await create_completion(
         model=MODEL,
-        messages=[{"role": "user", "content": prompt}]
+        messages=[
+            {"role": "system", "content": COLOR_PALETTE_SYSTEM},
+            {"role": "user", "content": prompt}
+        ]
     )
 
     raw_output = response.choices[0].message.content
     
     # Extract HEX codes using regex
-    import re
-    hex_codes = re.findall(r'#(?:[0-9a-fA-F]{3}){1,2}\b', raw_output)
+    hex_codes = _HEX_RE.findall(raw_output)
     
     # Return both the full description and extracted HEX codes
     return {
@@ -252,26 +445,21 @@ def get_color_palette(
         "secondary": hex_codes[1] if len(hex_codes) > 1 else None
     }
 
-import speech_recognition as sr
-import tempfile
-
-def transcribe_audio(file):
-    recognizer = sr.Recognizer()
-
-    # Save uploaded file temporarily
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_audio:
-        temp_audio.write(file)
-        temp_audio_path = temp_audio.name
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "whisper-large-v3")
 
+async def transcribe_audio(file, filename: str = "audio.wav"):
+    # Groq infers the audio format from the filename extension
     try:
-        with sr.AudioFile(temp_audio_path) as source:
-            audio_data = recognizer.record(source)
-            text = recognizer.recognize_google(audio_data)
-            return text
+        transcription = await create_transcription(
+            file=(filename, file),
+            model=WHISPER_MODEL
+        )
+        return transcription.text
     except Exception as e:
         return f"Error: {str(e)}"
 
-def generate_tagline(
+@_memoize_generation
+async def generate_tagline(
     brand_name: str,
     industry: str,
     tone: str,
@@ -287,51 +475,25 @@ def generate_tagline(
         feedback_text = f"\nUser requested changes: {feedback}\nPlease incorporate this feedback."
 
     prompt = f"""
-    Generate 5 unique, powerful taglines for this brand.
-
     Brand: {brand_name}
     Industry: {industry}
     Tone: {tone}
 
     {exclude_text}
     {feedback_text}
-
-    IMPORTANT: Return your response as a JSON object with this exact structure:
-    {{
-        "taglines": [
-            "First tagline here",
-            "Second tagline here",
-            "Third tagline here",
-            "Fourth tagline here",
-            "Fifth tagline here"
-        ]
-    }}
-
-    Example format:
-    {{
-        "taglines": [
-            "Innovate Without Limits",
-            "Future Ready, Today",
-            "Think Forward, Move Fast",
-            "Where Ideas Take Flight",
-            "Building Tomorrow Together"
-        ]
-    }}
-
-    Return ONLY the JSON object, no other text or formatting.
     """
 
-    response = client.chat.completions.create(
+    response = await create_completion(
         model=MODEL,
-        messages=[{"role": "user", "content": prompt}]
+        messages=[
+            {"role": "system", "content": TAGLINE_SYSTEM},
+            {"role": "user", "content": prompt}
+        ]
     )
 
     raw_output = response.choices[0].message.content
     
     # Parse JSON response
-    import json
-    import re
-    
     try:
         # Try to parse directly
         result = json.loads(raw_output)
@@ -342,7 +504,7 @@ def generate_tagline(
     
     # Fallback: try to extract JSON from the response
     try:
-        json_match = re.search(r'\{[\s\S]*\}', raw_output)
+        json_match = _JSON_OBJECT_RE.search(raw_output)
         if json_match:
             result = json.loads(json_match.group())
             if "taglines" in result and isinstance(result["taglines"], list):
@@ -351,15 +513,7 @@ def generate_tagline(
         pass
     
     # Last resort: manually parse lines
-    lines = raw_output.split('\n')
-    taglines = []
-    for line in lines:
-        line = line.strip()
-        if line and not line.startswith('{') and not line.startswith('}'):
-            # Remove numbers and bullets
-            clean = re.sub(r'^[\d\•\-\*\.\s]+', '', line)
-            if clean and len(clean) < 100:
-                taglines.append(clean)
+    taglines = [t for t in _TAGLINE_RE.findall(raw_output) if len(t) < 100]
     
     # Ensure we have 5
     while len(taglines) < 5:
@@ -368,7 +522,7 @@ def generate_tagline(
     return {"taglines": taglines[:5]}
 
 
-def generate_product_description(
+async def generate_product_description(
     brand_name: str,
     industry: str,
     tone: str,
@@ -386,8 +540,6 @@ def generate_product_description(
         feedback_text = f"\nUser requested changes: {feedback}\nPlease incorporate this feedback."
 
     prompt = f"""
-    Write a product description.
-
     Brand: {brand_name}
     Industry: {industry}
     Tone: {tone}
@@ -399,14 +551,17 @@ def generate_product_description(
     {feedback_text}
     """
 
-    response = client.chat.completions.create(
+    response = await create_completion(
         model=MODEL,
-        messages=[{"role": "user", "content": prompt}]
+        messages=[
+            {"role": "system", "content": PRODUCT_DESCRIPTION_SYSTEM},
+            {"role": "user", "content": prompt}
+        ]
     )
 
     return response.choices[0].message.content
 
-def generate_social_post(
+async def generate_social_post(
     brand_name: str,
     industry: str,
     tone: str,
@@ -424,8 +579,7 @@ def generate_social_post(
         feedback_text = f"\nUser requested changes: {feedback}\nPlease incorporate this feedback."
 
     prompt = f"""
-    Create a {platform} post.
-
+    Platform: {platform}
     Brand: {brand_name}
     Industry: {industry}
     Tone: {tone}
@@ -435,14 +589,17 @@ def generate_social_post(
     {feedback_text}
     """
 
-    response = client.chat.completions.create(
+    response = await create_completion(
         model=MODEL,
-        messages=[{"role": "user", "content": prompt}]
+        messages=[
+            {"role": "system", "content": SOCIAL_POST_SYSTEM},
+            {"role": "user", "content": prompt}
+        ]
     )
 
     return response.choices[0].message.content
 
-def generate_email(
+async def generate_email(
     brand_name: str,
     industry: str,
     tone: str,
@@ -460,8 +617,7 @@ def generate_email(
         feedback_text = f"\nUser requested changes: {feedback}\nPlease incorporate this feedback."
 
     prompt = f"""
-    Write a {email_type} email.
-
+    Email Type: {email_type}
     Brand: {brand_name}
     Industry: {industry}
     Tone: {tone}
@@ -471,14 +627,17 @@ def generate_email(
     {feedback_text}
     """
 
-    response = client.chat.completions.create(
+    response = await create_completion(
         model=MODEL,
-        messages=[{"role": "user", "content": prompt}]
+        messages=[
+            {"role": "system", "content": EMAIL_SYSTEM},
+            {"role": "user", "content": prompt}
+        ]
     )
 
     return response.choices[0].message.content
 
-def summarize_text(
+async def summarize_text(
     brand_name: str,
     tone: str,
     text: str,
@@ -494,8 +653,6 @@ def summarize_text(
         feedback_text = f"\nUser requested changes: {feedback}\nPlease incorporate this feedback."
 
     prompt = f"""
-    Summarize this text.
-
     Brand: {brand_name}
     Tone: {tone}
 
@@ -506,24 +663,182 @@ def summarize_text(
     {feedback_text}
     """
 
-    response = client.chat.completions.create(
+    response = await create_completion(
         model=MODEL,
-        messages=[{"role": "user", "content": prompt}]
+        messages=[
+            {"role": "system", "content": SUMMARIZE_SYSTEM},
+            {"role": "user", "content": prompt}
+        ]
     )
 
     return response.choices[0].message.content
 
-def generate_competitor_analysis(url: str):
-    structured_data = analyze_competitor_site(url)
+@_memoize_generation
+async def generate_brand_bundle(
+    industry: str,
+    keywords: str,
+    tone: str,
+    brand_name: Optional[str] = None,
+    exclude: Optional[dict] = None,
+    feedback: Optional[str] = None,
+    product: Optional[dict] = None,
+    social: Optional[dict] = None,
+    email: Optional[dict] = None
+):
+    """
+    Generates brand names, taglines, a color palette and a logo prompt in a
+    single completion. If brand_name is given, the other artifacts are built
+    around it; otherwise the first suggested name is used.
+
+    product ({"name", "features"}), social ({"platform", "topic"}) and
+    email ({"type", "topic"}) optionally add that content to the same call.
+
+    exclude maps a field ("names", "taglines", "palettes", "logo_prompts",
+    "product_descriptions", "social_posts", "emails") to previous outputs
+    that should not be repeated.
+    Returns {"names", "taglines", "palette", "logo_prompt",
+    "product_description", "social_post", "email"} where palette has the
+    same shape as get_color_palette() and unrequested content is None.
+    """
+    exclude = exclude or {}
+    exclude_text = ""
+    if exclude.get("names"):
+        exclude_text += f"\nDo NOT generate these names again: {exclude['names']}"
+    if exclude.get("taglines"):
+        exclude_text += f"\nAvoid repeating these previous taglines: {exclude['taglines']}"
+    if exclude.get("palettes"):
+        exclude_text += f"\nDo NOT generate these color palettes again: {exclude['palettes']}"
+    if exclude.get("logo_prompts"):
+        exclude_text += f"\nDo NOT generate these logo prompts again: {exclude['logo_prompts']}"
+    if product and exclude.get("product_descriptions"):
+        exclude_text += f"\nDo not repeat previous descriptions: {exclude['product_descriptions']}"
+    if social and exclude.get("social_posts"):
+        exclude_text += f"\nAvoid repeating previous posts: {exclude['social_posts']}"
+    if email and exclude.get("emails"):
+        exclude_text += f"\nAvoid repeating previous emails: {exclude['emails']}"
+
+    extra_text = ""
+    if product:
+        extra_text += f"\nproduct_description — Product: {product['name']}; Features: {product['features']}"
+    if social:
+        extra_text += f"\nsocial_post — Platform: {social['platform']}; Topic: {social['topic']}"
+    if email:
+        extra_text += f"\nemail — Email Type: {email['type']}; Topic: {email['topic']}"
+    if extra_text:
+        extra_text = "Also include:" + extra_text
 
-    if "error" in structured_data:
-        return structured_data
+    feedback_text = ""
+    if feedback:
+        feedback_text = f"\nUser requested changes: {feedback}\nPlease incorporate this feedback."
+
+    if brand_name:
+        name_text = f"Brand Name: {brand_name}\nBuild every artifact around this name and return it as the only entry in names."
+    else:
+        name_text = "Suggest 10 unique brand names and build the other artifacts around the first one."
 
     prompt = f"""
-    You are a competitive brand strategist.
+    Industry: {industry}
+    Keywords: {keywords}
+    Tone: {tone}
+    {name_text}
+    {extra_text}
+
+    {exclude_text}
+    {feedback_text}
+    """
+
+    response = await create_completion(
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": BRAND_BUNDLE_SYSTEM},
+            {"role": "user", "content": prompt}
+        ],
+        response_format={"type": "json_object"}
+    )
+
+    try:
+        result = json.loads(response.choices[0].message.content)
+    except (TypeError, ValueError) as e:
+        print(f"⚠️ Brand bundle JSON parse failed: {e}")
+        result = {}
+
+    names = [n.strip() for n in result.get("names") or [] if isinstance(n, str) and n.strip()]
+    names = list(dict.fromkeys(names))
+    if brand_name:
+        names = [brand_name]
+
+    taglines = [t.strip() for t in result.get("taglines") or [] if isinstance(t, str) and t.strip()]
+
+    palette = result.get("palette") if isinstance(result.get("palette"), dict) else {}
+    hex_codes = [h for h in palette.get("hex_codes") or [] if isinstance(h, str)][:5]
+    description = palette.get("description")
+    description = description.strip() if isinstance(description, str) else ""
+    palette = {
+        "full_description": description,
+        "hex_codes": hex_codes,
+        "primary": palette.get("primary") or (hex_codes[0] if hex_codes else None),
+        "secondary": palette.get("secondary") or (hex_codes[1] if len(hex_codes) > 1 else None)
+    }
 
-    Below is structured data scraped from a competitor website.
+    logo_prompt = result.get("logo_prompt") if isinstance(result.get("logo_prompt"), str) else None
+
+    def requested_text(key, wanted):
+        value = result.get(key)
+        if wanted and isinstance(value, str) and value.strip():
+            return value.strip()
+        return None
+
+    product_description = requested_text("product_description", product)
+    social_post = requested_text("social_post", social)
+    email_text = requested_text("email", email)
+
+    # Fill anything the combined call failed to produce with the dedicated generators
+    if not names:
+        names = await generate_brand_names(industry, keywords, tone, exclude=exclude.get("names"), feedback=feedback)
+    selected_name = names[0] if names else brand_name
+
+    fallbacks = {}
+    if not taglines:
+        fallbacks["taglines"] = generate_tagline(selected_name, industry, tone, exclude=exclude.get("taglines"), feedback=feedback)
+    # The palette is stored as a whole, so a missing description regenerates it too
+    if not hex_codes or not description:
+        fallbacks["palette"] = get_color_palette(tone, industry, brand_name=selected_name, exclude=exclude.get("palettes"), feedback=feedback)
+    if not logo_prompt:
+        fallbacks["logo_prompt"] = generate_logo_prompt(selected_name, industry, keywords, exclude=exclude.get("logo_prompts"), feedback=feedback)
+    if product and not product_description:
+        fallbacks["product_description"] = generate_product_description(selected_name, industry, tone, product["name"], product["features"], exclude=exclude.get("product_descriptions"), feedback=feedback)
+    if social and not social_post:
+        fallbacks["social_post"] = generate_social_post(selected_name, industry, tone, social["platform"], social["topic"], exclude=exclude.get("social_posts"), feedback=feedback)
+    if email and not email_text:
+        fallbacks["email"] = generate_email(selected_name, industry, tone, email["type"], email["topic"], exclude=exclude.get("emails"), feedback=feedback)
+
+    if fallbacks:
+        filled = dict(zip(fallbacks, await asyncio.gather(*fallbacks.values())))
+        if "taglines" in filled:
+            taglines = filled["taglines"].get("taglines", [])
+        palette = filled.get("palette", palette)
+        logo_prompt = filled.get("logo_prompt", logo_prompt)
+        product_description = filled.get("product_description", product_description)
+        social_post = filled.get("social_post", social_post)
+        email_text = filled.get("email", email_text)
 
+    return {
+        "names": names,
+        "taglines": taglines[:5],
+        "palette": palette,
+        "logo_prompt": logo_prompt,
+        "product_description": product_description,
+        "social_post": social_post,
+        "email": email_text
+    }
+
+async def generate_competitor_analysis(url: str):
+    structured_data = await analyze_competitor_site(url)
+
+    if "error" in structured_data:
+        return structured_data
+
+    prompt = f"""
     Pages Scraped: {structured_data['pages_scraped']}
     Top Keywords: {structured_data['top_keywords']}
     Headings: {structured_data['headings']}
@@ -533,25 +848,42 @@ def generate_competitor_analysis(url: str):
 
     Website Text Sample:
     {structured_data['text_sample']}
-
-    Provide:
-    - Competitor positioning summary
-    - Core products/services offered
-    - Messaging style analysis
-    - Color psychology interpretation
-    - CTA strategy analysis
-    - What strategic elements are strong
-    - What could be copied or improved
-
-    Be analytical and structured.
     """
 
-    response = client.chat.completions.create(
+    response = await create_completion(
         model=MODEL,
-        messages=[{"role": "user", "content": prompt}]
+        messages=[
+            {"role": "system", "content": COMPETITOR_ANALYSIS_SYSTEM},
+            {"role": "user", "content": prompt}
+        ]
     )
 
     return {
         "structured_data": structured_data,
         "strategic_analysis": response.choices[0].message.content
     }
+
+
+# ========== SYNC WRAPPERS ==========
+# For CLI callers and scripts that aren't running an event loop.
+def _sync(fn):
+    def wrapper(*args, **kwargs):
+        return asyncio.run(fn(*args, **kwargs))
+    wrapper.__name__ = f"{fn.__name__}_sync"
+    wrapper.__doc__ = fn.__doc__
+    return wrapper
+
+generate_brand_names_sync = _sync(generate_brand_names)
+generate_marketing_content_sync = _sync(generate_marketing_content)
+analyze_sentiment_sync = _sync(analyze_sentiment)
+chat_with_ai_sync = _sync(chat_with_ai)
+generate_logo_prompt_sync = _sync(generate_logo_prompt)
+get_color_palette_sync = _sync(get_color_palette)
+generate_tagline_sync = _sync(generate_tagline)
+generate_product_description_sync = _sync(generate_product_description)
+generate_social_post_sync = _sync(generate_social_post)
+generate_email_sync = _sync(generate_email)
+summarize_text_sync = _sync(summarize_text)
+transcribe_audio_sync = _sync(transcribe_audio)
+generate_brand_bundle_sync = _sync(generate_brand_bundle)
+generate_competitor_analysis_sync = _sync(generate_competitor_analysis)
@@ -1,47 +1,203 @@
 import json
 import uuid
 import os
+import hashlib
+import hmac
+import sqlite3
+import threading
+import time
 from datetime import datetime
 
-USERS_FILE = "users.json"
+USERS_FILE = "users.json"  # legacy store, imported once into USERS_DB
+USERS_DB = "users.db"
 
-def load_users():
-    if os.path.exists(USERS_FILE):
+_SCRYPT_N = 2 ** 14
+_SCRYPT_R = 8
+_SCRYPT_P = 1
+_SALT_BYTES = 16
+
+_DB = sqlite3.connect(USERS_DB, check_same_thread=False)
+_DB.row_factory = sqlite3.Row
+_LOCK = threading.Lock()
+
+# username -> user dict, so authenticated requests skip the query.
+# data_version changes whenever another connection commits, which lets us
+# drop the cache if another worker process wrote to the database. Our own
+# writes drop their entries directly, so it is only checked on a miss or
+# at most every _CACHE_CHECK_INTERVAL seconds.
+_USER_CACHE = {}
+_CACHE_CHECK_INTERVAL = 1.0
+_cache_data_version = None
+_cache_checked_at = 0.0
+
+
+def hash_password(password, salt=None):
+    salt = salt or os.urandom(_SALT_BYTES)
+    digest = hashlib.scrypt(password.encode("utf-8"), salt=salt, n=_SCRYPT_N, r=_SCRYPT_R, p=_SCRYPT_P)
+    return salt + digest
+
+
+def verify_password(password, pw_hash):
+    pw_hash = bytes(pw_hash)
+    salt = pw_hash[:_SALT_BYTES]
+    return hmac.compare_digest(hash_password(password, salt), pw_hash)
+
+
+def _row_to_user(row):
+    return {
+        "session_id": row["session_id"],
+        "brand_session_id": row["brand_session_id"],
+        "created_at": row["created_at"],
+        "last_login": row["last_login"]
+    }
+
+
+def _init_db():
+    with _LOCK, _DB:
+        _DB.execute("PRAGMA journal_mode=WAL")
+        _DB.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                username TEXT PRIMARY KEY,
+                pw_hash BLOB NOT NULL,
+                session_id TEXT NOT NULL,
+                brand_session_id TEXT,
+                created_at TEXT,
+                last_login TEXT
+            )
+        """)
+        empty = _DB.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0
+
+    # One-time import of the old plaintext JSON store
+    if empty and os.path.exists(USERS_FILE):
         with open(USERS_FILE, 'r') as f:
-            return json.load(f)
-    return {}
+            legacy = json.load(f)
+        with _LOCK, _DB:
+            _DB.executemany(
+                "INSERT OR IGNORE INTO users VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        username,
+                        hash_password(data["password"]),
+                        data["session_id"],
+                        data.get("brand_session_id"),
+                        data.get("created_at"),
+                        data.get("last_login")
+                    )
+                    for username, data in legacy.items()
+                ]
+            )
+        print(f"Imported {len(legacy)} users from {USERS_FILE}")
+
+
+_init_db()
+
+
+def _check_cache():
+    global _cache_data_version, _cache_checked_at
+    _cache_checked_at = time.monotonic()
+    data_version = _DB.execute("PRAGMA data_version").fetchone()[0]
+    if data_version != _cache_data_version:
+        _USER_CACHE.clear()
+        _cache_data_version = data_version
+
+
+def get_user(username):
+    user = _USER_CACHE.get(username)
+    if user is not None:
+        if time.monotonic() - _cache_checked_at < _CACHE_CHECK_INTERVAL:
+            return dict(user)
+        # Due for a check; if a write holds the lock, serve the hit and
+        # check on a later call rather than wait behind it
+        if not _LOCK.acquire(blocking=False):
+            return dict(user)
+        try:
+            _check_cache()
+            user = _USER_CACHE.get(username)
+        finally:
+            _LOCK.release()
+        if user is not None:
+            return dict(user)
+
+    with _LOCK:
+        _check_cache()
+        user = _USER_CACHE.get(username)
+        if user is None:
+            row = _DB.execute(
+                "SELECT session_id, brand_session_id, created_at, last_login FROM users WHERE username = ?",
+                (username,)
+            ).fetchone()
+            if row is None:
+                return None
+            user = _USER_CACHE[username] = _row_to_user(row)
+    return dict(user)
+
+
+def set_brand_session_id(username, brand_session_id):
+    with _LOCK, _DB:
+        _DB.execute(
+            "UPDATE users SET brand_session_id = ? WHERE username = ?",
+            (brand_session_id, username)
+        )
+        _USER_CACHE.pop(username, None)
+
+
+def load_users():
+    with _LOCK:
+        rows = _DB.execute(
+            "SELECT username, session_id, brand_session_id, created_at, last_login FROM users"
+        ).fetchall()
+    return {row["username"]: _row_to_user(row) for row in rows}
+
 
 def save_users(users):
-    with open(USERS_FILE, 'w') as f:
-        json.dump(users, f, indent=2)
+    # Passwords are never part of the returned user dicts, so only the
+    # mutable fields are written back.
+    with _LOCK, _DB:
+        _DB.executemany(
+            "UPDATE users SET session_id = ?, brand_session_id = ?, last_login = ? WHERE username = ?",
+            [
+                (data["session_id"], data.get("brand_session_id"), data.get("last_login"), username)
+                for username, data in users.items()
+            ]
+        )
+        _USER_CACHE.clear()
+
 
 def register_user(username, password):
-    users = load_users()
-    
-    if username in users:
+    session_id = str(uuid.uuid4())  # Auth session ID
+    pw_hash = hash_password(password)
+
+    with _LOCK, _DB:
+        cursor = _DB.execute(
+            "INSERT INTO users (username, pw_hash, session_id, brand_session_id, created_at, last_login) "
+            "VALUES (?, ?, ?, NULL, ?, NULL) ON CONFLICT(username) DO NOTHING",
+            (username, pw_hash, session_id, datetime.now().isoformat())
+        )
+
+    if cursor.rowcount == 0:
         return {"error": "Username already exists"}
-    
-    users[username] = {
-        "password": password,
-        "session_id": str(uuid.uuid4()),  # Auth session ID
-        "brand_session_id": None,  # Will be set during intake
-        "created_at": datetime.now().isoformat(),
-        "last_login": None
-    }
-    
-    save_users(users)
-    return {"success": True, "session_id": users[username]["session_id"]}
+
+    return {"success": True, "session_id": session_id}
+
 
 def login_user(username, password):
-    users = load_users()
-    
-    if username not in users:
+    with _LOCK:
+        row = _DB.execute(
+            "SELECT pw_hash, session_id FROM users WHERE username = ?",
+            (username,)
+        ).fetchone()
+
+    if row is None:
         return {"error": "User not found"}
-    
-    if users[username]["password"] != password:
+
+    if not verify_password(password, row["pw_hash"]):
         return {"error": "Invalid password"}
-    
-    users[username]["last_login"] = datetime.now().isoformat()
-    save_users(users)
-    
-    return {"success": True, "session_id": users[username]["session_id"]}
\ No newline at end of file
+
+    with _LOCK, _DB:
+        _DB.execute(
+            "UPDATE users SET last_login = ? WHERE username = ?",
+            (datetime.now().isoformat(), username)
+        )
+        _USER_CACHE.pop(username, None)
+
+    return {"success": True, "session_id": row["session_id"]}
@@ -1,6 +1,15 @@
+import asyncio
+import threading
 import whois
+from cachetools import TTLCache
 
-def check_domain_availability(domain: str):
+# Registration status rarely changes within an hour
+_CACHE = TTLCache(maxsize=4096, ttl=3600)
+_CACHE_LOCK = threading.Lock()
+WHOIS_MAX_CONCURRENCY = 8
+
+
+def _lookup(domain: str):
     try:
         w = whois.whois(domain)
 
@@ -13,3 +22,34 @@ def check_domain_availability(domain: str):
     except Exception:
         # If WHOIS lookup fails, usually means domain is available
         return True
+
+
+def check_domain_availability(domain: str):
+    with _CACHE_LOCK:
+        if domain in _CACHE:
+            return _CACHE[domain]
+
+    available = _lookup(domain)
+
+    with _CACHE_LOCK:
+        _CACHE[domain] = available
+    return available
+
+
+async def check_domain_availability_batch(domains: list[str]) -> dict[str, bool]:
+    """
+    Checks several domains concurrently, reusing cached results.
+    At most WHOIS_MAX_CONCURRENCY lookups are in flight at once.
+    """
+    sem = asyncio.Semaphore(WHOIS_MAX_CONCURRENCY)
+
+    async def check(domain):
+        with _CACHE_LOCK:
+            if domain in _CACHE:
+                return _CACHE[domain]
+        async with sem:
+            return await asyncio.to_thread(check_domain_availability, domain)
+
+    unique = list(dict.fromkeys(domains))
+    results = await asyncio.gather(*(check(d) for d in unique))
+    return dict(zip(unique, results))
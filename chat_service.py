@@ -1,51 +1,70 @@
-from groq import Groq
-import os
-from dotenv import load_dotenv
+from collections import deque
+from llm_client import create_completion, MODEL
 
-load_dotenv()
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-MODEL = os.getenv("GROQ_MODEL")
+# Messages kept per session (4 user/assistant turns); older ones drop off
+CHAT_HISTORY_MAXLEN = 8
 
-def build_chat_prompt(session, user_message, chat_history):
-    recent_history = chat_history[-10:] if chat_history else []
-    
-    history_text = ""
-    for msg in recent_history:
-        role = "User" if msg["role"] == "user" else "Assistant"
-        history_text += f"{role}: {msg['content']}\n"
-    
-    brand_context = f"""
-    Current Brand Information:
-    - Brand Name: {session.get('brand_name', 'Not generated yet')}
-    - Industry: {session.get('industry', 'Unknown')}
-    - Tone: {session.get('tone', 'Unknown')}
-    - Target Audience: {session.get('target_audience', 'Unknown')}
-    - Brand Personality: {session.get('brand_personality', 'Unknown')}
-    - Keywords: {session.get('keywords', 'Unknown')}
+# Static instructions sent as the system message so the prefix stays
+# identical across turns and can be served from the provider's prompt cache.
+CHAT_CONTEXT_SYSTEM = """You are BizForge, an expert branding consultant with full context of this brand.
+Provide strategic, actionable advice that aligns with the brand's personality and goals.
+Be helpful, specific, and reference the brand context where relevant."""
+
+def new_chat_history(messages=()):
+    return deque(messages, maxlen=CHAT_HISTORY_MAXLEN)
+
+# Session fields rendered into the brand context block
+_BRAND_CONTEXT_FIELDS = ("brand_name", "industry", "tone", "target_audience", "brand_personality", "keywords")
+
+def get_brand_context(session):
+    """
+    Returns the rendered brand context, cached on the session and
+    re-rendered only when one of its fields changes. Keeping it stable
+    lets it sit in the cacheable system prefix across chat turns.
     """
+    fields = [session.get(field) for field in _BRAND_CONTEXT_FIELDS]
+    cached = session.get("_brand_context_cache")
+    if cached and cached["fields"] == fields:
+        return cached["text"]
+
+    text = f"""Current Brand Information:
+- Brand Name: {session.get('brand_name', 'Not generated yet')}
+- Industry: {session.get('industry', 'Unknown')}
+- Tone: {session.get('tone', 'Unknown')}
+- Target Audience: {session.get('target_audience', 'Unknown')}
+- Brand Personality: {session.get('brand_personality', 'Unknown')}
+- Keywords: {session.get('keywords', 'Unknown')}"""
+
+    session["_brand_context_cache"] = {"fields": fields, "text": text}
+    return text
+
+def build_chat_prompt(session, user_message, chat_history):
+    history_text = "\n".join(
+        f"{'User' if msg['role'] == 'user' else 'Assistant'}: {msg['content']}"
+        for msg in chat_history
+    )
     
     prompt = f"""
-    You are BizForge, an expert branding consultant with full context of this brand.
-    
-    {brand_context}
-    
     Conversation History:
     {history_text}
     
     User: {user_message}
-    
-    Provide strategic, actionable advice that aligns with the brand's personality and goals.
-    Be helpful, specific, and reference the brand context where relevant.
     """
     
     return prompt
 
-def chat_with_context(session, user_message):
+async def chat_with_context(session, user_message):
+    if not isinstance(session["chat_history"], deque):
+        session["chat_history"] = new_chat_history(session["chat_history"])
+
     prompt = build_chat_prompt(session, user_message, session["chat_history"])
     
-    response = client.chat.completions.create(
+    response = await create_completion(
         model=MODEL,
-        messages=[{"role": "user", "content": prompt}]
+        messages=[
+            {"role": "system", "content": f"{CHAT_CONTEXT_SYSTEM}\n\n{get_brand_context(session)}"},
+            {"role": "user", "content": prompt}
+        ]
     )
     
     ai_response = response.choices[0].message.content
@@ -53,7 +72,4 @@ def chat_with_context(session, user_message):
     session["chat_history"].append({"role": "user", "content": user_message})
     session["chat_history"].append({"role": "assistant", "content": ai_response})
     
-    if len(session["chat_history"]) > 4:
-        session["chat_history"] = session["chat_history"][-4:]
-    
     return ai_response
\ No newline at end of file
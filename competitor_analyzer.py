@@ -1,129 +1,206 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import httpx
+from bs4 import BeautifulSoup, NavigableString, Tag
 from urllib.parse import urljoin, urlparse
 import re
 from collections import Counter
 
+_HEX_RE = re.compile(r'#(?:[0-9a-fA-F]{3}){1,2}')
+_WORD_RE = re.compile(r'\b[a-zA-Z]{4,}\b')
+_WS_RE = re.compile(r'\s+')
+_STOPWORDS = frozenset({
+    "about","their","with","from","this","that","have","your",
+    "more","they","will","what","when","where","which","them",
+    "privacy","terms","cookie","contact","login","signup"
+})
+# parse_page skips _SKIP_TAGS subtrees and only takes links from _CHROME_TAGS
+_SKIP_TAGS = frozenset({"script", "style"})
+_CHROME_TAGS = frozenset({"nav", "footer"})
+
 
 def extract_colors_from_css(text):
-    hex_colors = re.findall(r'#(?:[0-9a-fA-F]{3}){1,2}', text)
-    return list(set(hex_colors))[:15]
+    hex_colors = _HEX_RE.findall(text)
+    return list(dict.fromkeys(hex_colors))[:15]
+
+
+def iter_keywords(text):
+    return (w for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS)
 
 
 def extract_keywords(text):
-    words = re.findall(r'\b[a-zA-Z]{4,}\b', text.lower())
-    stopwords = set([
-        "about","their","with","from","this","that","have","your",
-        "more","they","will","what","when","where","which","them",
-        "privacy","terms","cookie","contact","login","signup"
-    ])
-    filtered = [w for w in words if w not in stopwords]
-    common = Counter(filtered).most_common(20)
+    common = Counter(iter_keywords(text)).most_common(20)
     return [w[0] for w in common]
 
 
 def clean_text(text):
-    text = re.sub(r'\s+', ' ', text)
+    text = _WS_RE.sub(' ', text)
     return text.strip()
 
 
-def detect_ctas(soup):
-    ctas = []
-    for tag in soup.find_all(["a", "button"]):
+def detect_ctas(tags):
+    for tag in tags:
         text = tag.get_text(strip=True).lower()
         if any(phrase in text for phrase in [
             "get started", "try", "sign up",
             "book demo", "contact sales",
             "learn more", "start free"
         ]):
-            ctas.append(text)
-    return list(set(ctas))[:10]
+            yield text
 
 
 def detect_product_links(links):
-    product_links = []
     for link in links:
         if any(word in link.lower() for word in [
             "product", "solutions", "services",
             "features", "platform", "pricing"
         ]):
-            product_links.append(link)
-    return list(set(product_links))[:10]
-
-
-def analyze_competitor_site(start_url, max_depth=2, max_pages=8):
-
-    visited = set()
-    to_visit = [(start_url, 0)]
-    domain = urlparse(start_url).netloc
+            yield link
 
-    all_text = ""
-    all_headings = []
-    all_colors = []
-    all_ctas = []
-    all_product_links = []
 
-    while to_visit and len(visited) < max_pages:
-        url, depth = to_visit.pop(0)
+def add_bounded(seen, items, limit):
+    """Adds items to an insertion-ordered dict until it holds limit entries."""
+    for item in items:
+        if len(seen) >= limit:
+            break
+        seen.setdefault(item, None)
 
-        if depth > max_depth or url in visited:
-            continue
 
-        try:
-            resp = requests.get(
-                url,
-                timeout=6,
-                headers={"User-Agent": "Mozilla/5.0"}
-            )
-            resp.raise_for_status()
-        except:
-            continue
+def parse_page(url, html):
+    """
+    Walks the parsed tree once, collecting links, visible text, headings
+    and CTA candidates. script/style subtrees are skipped entirely;
+    nav/footer contribute links only.
+    """
+    soup = BeautifulSoup(html, "lxml")
 
-        visited.add(url)
+    links = []
+    text_parts = []
+    headings = []
+    cta_tags = []
 
-        soup = BeautifulSoup(resp.text, "html.parser")
+    stack = [(soup, False)]
+    while stack:
+        node, chrome = stack.pop()
 
-        # Collect links BEFORE removing elements
-        links = [urljoin(url, a["href"]) for a in soup.find_all("a", href=True)]
+        if isinstance(node, Tag):
+            name = node.name
+            if name in _SKIP_TAGS:
+                continue
 
-        # Remove unnecessary tags
-        for tag in soup(["script", "style", "nav", "footer"]):
-            tag.decompose()
+            if name == "a" and node.get("href") is not None:
+                links.append(urljoin(url, node["href"]))
 
-        page_text = clean_text(soup.get_text(separator=" "))
-        all_text += " " + page_text[:1500]
+            chrome = chrome or name in _CHROME_TAGS
+            if not chrome:
+                if name in ("h1", "h2"):
+                    headings.append(node.get_text(strip=True))
+                elif name in ("a", "button"):
+                    cta_tags.append(node)
 
-        headings = [h.get_text(strip=True) for h in soup.find_all(["h1", "h2"])]
-        all_headings.extend(headings[:5])
+            # Reversed so children are popped in document order
+            stack.extend((child, chrome) for child in reversed(node.contents))
 
-        colors = extract_colors_from_css(resp.text)
-        all_colors.extend(colors)
+        elif not chrome and type(node) is NavigableString:
+            text_parts.append(node)
 
-        ctas = detect_ctas(soup)
-        all_ctas.extend(ctas)
+    page_text = clean_text(" ".join(text_parts))
 
-        product_links = detect_product_links(links)
-        all_product_links.extend(product_links)
+    return {
+        "links": links,
+        "text": page_text,
+        "headings": headings,
+        "colors": extract_colors_from_css(html),
+        "ctas": list(dict.fromkeys(detect_ctas(cta_tags))),
+        "product_links": list(dict.fromkeys(detect_product_links(links)))
+    }
 
-        if depth < max_depth:
-            for link in links:
-                parsed = urlparse(link)
 
-                if parsed.netloc == domain and link not in visited:
-                    if not any(skip in link.lower() for skip in [
-                        "login", "signup", "privacy",
-                        "terms", "blog", "careers"
-                    ]):
-                        to_visit.append((link, depth + 1))
+async def analyze_competitor_site(start_url, max_depth=2, max_pages=8, max_concurrency=4):
+    """
+    Crawls the competitor site breadth-first, fetching each depth level
+    concurrently (bounded by max_concurrency). Parsing runs in a worker
+    thread so it overlaps with the remaining fetches of the level.
+    """
+    visited = set()
+    domain = urlparse(start_url).netloc
 
-    keywords = extract_keywords(all_text)
+    text_chunks = []
+    keyword_counts = Counter()
+    all_headings = []
+    all_colors = {}
+    all_ctas = {}
+    all_product_links = {}
+
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async with httpx.AsyncClient(
+        headers={"User-Agent": "Mozilla/5.0"},
+        timeout=6,
+        follow_redirects=True
+    ) as client:
+
+        async def fetch_and_parse(url):
+            try:
+                async with sem:
+                    resp = await client.get(url)
+                resp.raise_for_status()
+            except Exception:
+                return url, None
+            return url, await asyncio.to_thread(parse_page, url, resp.text)
+
+        wave = [start_url]
+        depth = 0
+
+        while wave and depth <= max_depth and len(visited) < max_pages:
+            batch = [u for u in wave if u not in visited]
+            batch = batch[:max_pages - len(visited)]
+
+            results = await asyncio.gather(*(fetch_and_parse(u) for u in batch))
+
+            # Insertion-ordered set: the same link found on many pages is queued once
+            next_wave = {}
+            for url, page in results:
+                if page is None:
+                    continue
+
+                visited.add(url)
+
+                chunk = page["text"][:1500]
+                text_chunks.append(chunk)
+                keyword_counts.update(iter_keywords(chunk))
+                all_headings.extend(page["headings"][:5])
+                add_bounded(all_colors, page["colors"], 8)
+                add_bounded(all_ctas, page["ctas"], 10)
+                add_bounded(all_product_links, page["product_links"], 10)
+
+                if depth < max_depth:
+                    for link in page["links"]:
+                        parsed = urlparse(link)
+
+                        if parsed.netloc == domain and link not in visited:
+                            if not any(skip in link.lower() for skip in [
+                                "login", "signup", "privacy",
+                                "terms", "blog", "careers"
+                            ]):
+                                next_wave.setdefault(link, None)
+
+            wave = list(next_wave)
+            depth += 1
+
+    all_text = " ".join(text_chunks)
+    keywords = [w for w, _ in keyword_counts.most_common(20)]
 
     return {
         "pages_scraped": len(visited),
         "top_keywords": keywords,
         "headings": all_headings[:15],
-        "detected_colors": list(set(all_colors))[:8],
-        "ctas": list(set(all_ctas))[:10],
-        "product_links": list(set(all_product_links))[:10],
+        "detected_colors": list(all_colors),
+        "ctas": list(all_ctas),
+        "product_links": list(all_product_links),
         "text_sample": all_text[:3000]
     }
+
+
+def analyze_competitor_site_sync(start_url, max_depth=2, max_pages=8):
+    """For scripts that aren't running an event loop."""
+    return asyncio.run(analyze_competitor_site(start_url, max_depth, max_pages))
@@ -0,0 +1,59 @@
+from groq import AsyncGroq
+from dotenv import load_dotenv
+import asyncio
+import hashlib
+import json
+import os
+
+load_dotenv()
+
+# One client (and one underlying connection pool) shared by every service
+client = AsyncGroq(api_key=os.getenv("GROQ_API_KEY"))
+MODEL = os.getenv("GROQ_MODEL")
+
+# Caps simultaneous Groq requests so bursts queue here instead of coming
+# back as 429s
+GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "16"))
+_semaphore = asyncio.Semaphore(GROQ_MAX_CONCURRENCY)
+
+# Identical requests already on the wire, keyed by a hash of their arguments
+_inflight = {}
+
+
+async def _create(kwargs):
+    async with _semaphore:
+        return await client.chat.completions.create(**kwargs)
+
+
+async def create_completion(**kwargs):
+    """
+    Drop-in for client.chat.completions.create. Requests are bounded by
+    GROQ_MAX_CONCURRENCY, and a request identical to one still in flight
+    awaits that call's response instead of sending a duplicate.
+    Streaming requests are bounded but never coalesced.
+    """
+    if kwargs.get("stream"):
+        return await _create(kwargs)
+
+    key = hashlib.blake2b(
+        json.dumps(kwargs, sort_keys=True, default=str).encode("utf-8"),
+        digest_size=16
+    ).digest()
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_create(kwargs))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+
+    # Shielded so one caller being cancelled doesn't cancel the shared call
+    return await asyncio.shield(task)
+
+
+async def create_transcription(**kwargs):
+    """
+    Drop-in for client.audio.transcriptions.create, bounded by the same
+    GROQ_MAX_CONCURRENCY semaphore. Uploads are never coalesced.
+    """
+    async with _semaphore:
+        return await client.audio.transcriptions.create(**kwargs)
@@ -1,27 +1,42 @@
-from fastapi import FastAPI, File, UploadFile, Header, HTTPException
+from fastapi import FastAPI, File, UploadFile, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse, ORJSONResponse, FileResponse
 from dotenv import load_dotenv
 import os
 from pydantic import BaseModel
 import uuid
+import hashlib
+import requests
 import json
+import orjson
+import base64
+from io import BytesIO
+import asyncio
+from collections import deque
+from itertools import islice
+import time
+import tempfile
+import anyio
+from concurrent.futures import ThreadPoolExecutor
 import re
 from typing import Optional, List
 from datetime import datetime
-from availability_checker import check_domain_availability
+from cachetools import LRUCache
+from availability_checker import check_domain_availability_batch
 from intake_parser import extract_brand_config, BrandConfig
-from auth_manager import load_users, register_user, login_user, save_users
-from chat_service import chat_with_context
+from auth_manager import get_user, register_user, login_user, set_brand_session_id
+from chat_service import chat_with_context, new_chat_history
+import session_store
 
 brand_sessions = {}
 from ai_service import (
     generate_brand_names,
+    stream_brand_names,
     generate_marketing_content,
     analyze_sentiment,
     chat_with_ai,
     generate_logo_prompt,
-    generate_logo_image,
+    generate_logo_image_bytes,
     get_color_palette,
     transcribe_audio,
     generate_tagline,
@@ -29,14 +44,15 @@ from ai_service import (
     generate_social_post,
     generate_email,
     summarize_text,
-    generate_competitor_analysis
+    generate_competitor_analysis,
+    generate_brand_bundle
 )
 
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="BizForge API")
+app = FastAPI(title="BizForge API", default_response_class=ORJSONResponse)
 
 # Enable CORS (important for frontend later)
 app.add_middleware(
@@ -50,63 +66,347 @@ app.add_middleware(
 # ========== TEMPLATE LOADING ==========
 TEMPLATE_HTML = None
 TEMPLATE_PATH = "brand-landing-template.html"
+# UTF-8 template bytes before/after its BRAND_DATA object, split and
+# encoded once at load time
+TEMPLATE_PREFIX = None
+TEMPLATE_SUFFIX = None
+# The template file is stat'ed at most this often and reloaded if it changed
+TEMPLATE_CHECK_INTERVAL = 5
+_template_mtime = None
+_template_checked_at = 0.0
+
+def _read_template():
+    """Reads and splits the template file; returns (mtime, html, prefix, suffix)."""
+    mtime = os.stat(TEMPLATE_PATH).st_mtime
+    with open(TEMPLATE_PATH, 'r', encoding='utf-8') as f:
+        template_html = f.read()
+    
+    prefix, suffix = split_template(template_html)
+    if prefix is not None:
+        prefix = prefix.encode("utf-8")
+        suffix = suffix.encode("utf-8")
+    return mtime, template_html, prefix, suffix
+
+def _set_template(template):
+    global TEMPLATE_HTML, TEMPLATE_PREFIX, TEMPLATE_SUFFIX, _template_mtime
+    _template_mtime, TEMPLATE_HTML, TEMPLATE_PREFIX, TEMPLATE_SUFFIX = template
 
 def load_template():
-    global TEMPLATE_HTML
+    global _template_checked_at
+    _template_checked_at = time.monotonic()
     try:
-        with open(TEMPLATE_PATH, 'r', encoding='utf-8') as f:
-            TEMPLATE_HTML = f.read()
-        print(f"✅ Template loaded: {len(TEMPLATE_HTML)} bytes")
+        template = _read_template()
+        print(f"✅ Template loaded: {len(template[1])} bytes")
     except Exception as e:
         print(f"❌ Failed to load template: {e}")
-        TEMPLATE_HTML = None
+        template = (None, None, None, None)
+    _set_template(template)
+
+async def refresh_template():
+    """
+    Reloads the template if its file changed; checks at most every
+    TEMPLATE_CHECK_INTERVAL seconds. The file is stat'ed, read and split
+    off the event loop, and the globals swapped on it.
+    """
+    global _template_checked_at
+    now = time.monotonic()
+    if now - _template_checked_at < TEMPLATE_CHECK_INTERVAL:
+        return
+    _template_checked_at = now
+    try:
+        mtime = await asyncio.to_thread(os.path.getmtime, TEMPLATE_PATH)
+    except OSError:
+        return
+    if mtime == _template_mtime:
+        return
+    try:
+        template = await asyncio.to_thread(_read_template)
+    except Exception as e:
+        # Keep serving the template already loaded
+        print(f"❌ Failed to reload template: {e}")
+        return
+    _set_template(template)
+    print(f"✅ Template reloaded: {len(TEMPLATE_HTML)} bytes")
 
 # ========== PERSISTENCE ==========
-SESSIONS_FILE = "sessions.json"
+# Sessions live in session_store's SQLite table, one row per session, so a
+# save only rewrites the sessions that changed
+
+# Session IDs changed since the last write
+_dirty_sessions = set()
 
 def load_sessions():
     global brand_sessions
-    if os.path.exists(SESSIONS_FILE):
-        try:
-            with open(SESSIONS_FILE, 'r') as f:
-                brand_sessions = json.load(f)
-                print(f"Loaded {len(brand_sessions)} sessions")
-        except:
-            brand_sessions = {}
-    else:
-        brand_sessions = {}
+    brand_sessions = session_store.load_sessions()
+    
+    for session_id, session in brand_sessions.items():
+        session["chat_history"] = new_chat_history(session.get("chat_history", []))
+        session["history"] = new_history(session.get("history"))
+        
+        # Move logos stored inline by older versions out to LOGOS_DIR
+        if "logo_image" in session:
+            logo_image = session.pop("logo_image")
+            session["logo_image_path"] = None
+            if logo_image and not logo_image.startswith("Error"):
+                session["logo_image_path"] = _write_logo(session_id, base64.b64decode(logo_image))
+            _dirty_sessions.add(session_id)
+    print(f"Loaded {len(brand_sessions)} sessions")
+    
+    if _dirty_sessions:
+        save_sessions()
+
+# session_id -> digest of the serialized session last written to the store
+_saved_digests = {}
+
+def _snapshot_dirty_sessions():
+    """
+    Serializes every dirty session and clears the dirty set. Sessions that
+    serialize identically to their last write are left out. Returns the
+    rows for session_store.write_sessions and their digests, which the
+    caller records in _saved_digests once the write succeeds.
+    """
+    snapshot = []
+    digests = {}
+    for session_id in _dirty_sessions:
+        session = brand_sessions.get(session_id)
+        if session is None:
+            continue
+        # default=list serializes the chat_history and history deques
+        data = orjson.dumps(session, default=list)
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        if _saved_digests.get(session_id) == digest:
+            continue
+        digests[session_id] = digest
+        snapshot.append((session_id, data, session.get("version", 1)))
+    _dirty_sessions.clear()
+    return snapshot, digests
 
 def save_sessions():
-    with open(SESSIONS_FILE, 'w') as f:
-        json.dump(brand_sessions, f, indent=2)
-    print(f"Saved {len(brand_sessions)} sessions")
+    """
+    Writes pending session changes immediately. Only for startup, before
+    the background writer runs; endpoints should use schedule_save().
+    """
+    snapshot, digests = _snapshot_dirty_sessions()
+    session_store.write_sessions(snapshot)
+    _saved_digests.update(digests)
+    print(f"Saved {len(snapshot)} sessions")
+
+# ========== LOGO STORAGE ==========
+# Logo images are kept on disk rather than in the session, so saving a
+# session never rewrites a multi-MB base64 blob
+LOGOS_DIR = "logos"
+# session_id -> base64 logo, for recently rendered sessions
+_LOGO_CACHE = LRUCache(maxsize=64)
+
+def _logo_path(session_id):
+    return os.path.join(LOGOS_DIR, f"{session_id}.png")
+
+def _write_logo(session_id, image_bytes):
+    os.makedirs(LOGOS_DIR, exist_ok=True)
+    path = _logo_path(session_id)
+    # A temp file per write, so overlapping writes for one session can't
+    # truncate each other's file
+    with tempfile.NamedTemporaryFile(dir=LOGOS_DIR, suffix=".tmp", delete=False) as f:
+        f.write(image_bytes)
+    os.replace(f.name, path)
+    return path
+
+async def store_logo(session, session_id, image_bytes):
+    """
+    Writes a generated logo to LOGOS_DIR and records its path on the session.
+    Returns it base64-encoded; that one encoding is cached for later renders.
+    """
+    session["logo_image_path"] = await asyncio.to_thread(_write_logo, session_id, image_bytes)
+    session.pop("logo_error", None)
+    image_base64 = _LOGO_CACHE[session_id] = base64.b64encode(image_bytes).decode("ascii")
+    _BRAND_DATA_CACHE.pop(session_id, None)
+    schedule_save(session_id)
+    return image_base64
+
+async def generate_session_logo(session, session_id, prompt):
+    """
+    Generates and stores the session's logo image. Like generate_logo_image,
+    returns base64 or an "Error: ..." string if the image API refused.
+    """
+    try:
+        image_bytes = await asyncio.to_thread(generate_logo_image_bytes, prompt)
+    except requests.HTTPError as e:
+        return f"Error: {e.response.text}"
+    return await store_logo(session, session_id, image_bytes)
+
+def _logo_is_current(session, session_id, prompt):
+    """False once the session was replaced or given a newer logo prompt."""
+    return brand_sessions.get(session_id) is session and session.get("logo_prompt") == prompt
+
+async def generate_session_logo_in_background(session, session_id, prompt):
+    """
+    Background-task variant of generate_session_logo. A failure is recorded
+    as session["logo_error"] so clients polling session-status can stop.
+    Results for a prompt the session has since moved on from are dropped.
+    """
+    try:
+        image_bytes = await asyncio.to_thread(generate_logo_image_bytes, prompt)
+        if _logo_is_current(session, session_id, prompt):
+            await store_logo(session, session_id, image_bytes)
+        return
+    except requests.HTTPError as e:
+        error = f"Error: {e.response.text}"
+    except Exception as e:
+        error = f"Error: {e}"
+    
+    print(f"⚠️ Background logo generation failed: {error}")
+    if not _logo_is_current(session, session_id, prompt):
+        return
+    session["logo_image_path"] = None
+    session["logo_error"] = error
+    _LOGO_CACHE.pop(session_id, None)
+    _BRAND_DATA_CACHE.pop(session_id, None)
+    schedule_save(session_id)
+
+# session_id -> (prompt, task) for logo images being generated in the background
+_PENDING_LOGOS = {}
+
+def start_background_logo(session, session_id, prompt):
+    """
+    Starts generate_session_logo_in_background for the session, or returns
+    the task already generating its image for the same prompt.
+    """
+    pending = _PENDING_LOGOS.get(session_id)
+    if pending and pending[0] == prompt and not pending[1].done():
+        return pending[1]
+    
+    task = asyncio.create_task(generate_session_logo_in_background(session, session_id, prompt))
+    _PENDING_LOGOS[session_id] = (prompt, task)
+    
+    def forget(done_task):
+        if _PENDING_LOGOS.get(session_id, (None, None))[1] is done_task:
+            del _PENDING_LOGOS[session_id]
+    
+    task.add_done_callback(forget)
+    return task
+
+def _read_logo_base64(path):
+    with open(path, 'rb') as f:
+        return base64.b64encode(f.read()).decode("ascii")
+
+async def load_logo_base64(session, session_id):
+    """Returns the session's stored logo as base64, or "" if it has none."""
+    path = session.get("logo_image_path")
+    if not path:
+        return ""
+    
+    image_base64 = _LOGO_CACHE.get(session_id)
+    if image_base64 is None:
+        try:
+            image_base64 = await asyncio.to_thread(_read_logo_base64, path)
+        except OSError:
+            return ""
+        _LOGO_CACHE[session_id] = image_base64
+    return image_base64
+
+# Saves requested within this window are coalesced into one write
+SAVE_DEBOUNCE_SECONDS = 0.5
+# Wait before retrying after a failed write
+SAVE_RETRY_SECONDS = 5
+_save_requested = asyncio.Event()
+# Held from snapshot to finished write, so writes from the background
+# writer, backups and shutdown can't land out of order
+_save_lock = asyncio.Lock()
+_session_writer_task = None
+
+def schedule_save(session_id):
+    """Marks a session dirty; the background writer persists it shortly after."""
+    _dirty_sessions.add(session_id)
+    _save_requested.set()
+
+async def _write_dirty_sessions():
+    """
+    Writes pending session changes off the event loop; the caller must hold
+    _save_lock. Returns the number of sessions written. On failure the
+    sessions are marked dirty again before the error propagates.
+    """
+    # Snapshot on the event loop, write off it
+    snapshot, digests = _snapshot_dirty_sessions()
+    if not snapshot:
+        return 0
+    try:
+        await asyncio.to_thread(session_store.write_sessions, snapshot)
+    except BaseException:
+        # Retry these on the next write
+        for session_id in digests:
+            schedule_save(session_id)
+        raise
+    _saved_digests.update(digests)
+    return len(snapshot)
+
+async def _session_writer():
+    while True:
+        await _save_requested.wait()
+        await asyncio.sleep(SAVE_DEBOUNCE_SECONDS)
+        _save_requested.clear()
+        try:
+            async with _save_lock:
+                saved = await _write_dirty_sessions()
+        except Exception as e:
+            print(f"❌ Failed to save sessions: {e}")
+            await asyncio.sleep(SAVE_RETRY_SECONDS)
+            continue
+        if saved:
+            print(f"Saved {saved} sessions")
+
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "200"))
 
 @app.on_event("startup")
-def startup_event():
-    load_sessions()
-    load_template()
+async def startup_event():
+    global _session_writer_task
+    # Sync endpoints (password hashing) run on anyio's limiter, and
+    # asyncio.to_thread work (WHOIS, logo images, crawling) on the loop's
+    # default executor; both defaults stall under a burst of requests
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=THREADPOOL_SIZE))
+    # Read from disk off the event loop
+    await asyncio.to_thread(load_sessions)
+    await asyncio.to_thread(load_template)
+    _session_writer_task = asyncio.create_task(_session_writer())
     print("BizForge API started with persistence and template")
 
 @app.on_event("shutdown")
-def shutdown_event():
-    save_sessions()
-    print("Sessions saved on shutdown")
+async def shutdown_event():
+    # Taking the lock first lets an in-flight write finish before the
+    # writer is cancelled
+    async with _save_lock:
+        if _session_writer_task:
+            _session_writer_task.cancel()
+        saved = await _write_dirty_sessions()
+    print(f"Saved {saved} sessions on shutdown")
 
 # ========== AUTH DEPENDENCY ==========
-def get_session_from_auth_dependency(authorization: str = Header(None)):
+def _parse_auth(authorization):
+    """Splits a "username:auth_session_id" header; (None, None) if malformed."""
+    i = authorization.find(":")
+    if i <= 0:
+        return None, None
+    return authorization[:i], authorization[i + 1:]
+
+def _authenticate(authorization):
+    """Returns (username, user) for a valid auth header, else raises 401."""
     if not authorization:
         raise HTTPException(status_code=401, detail="No auth header")
     
-    try:
-        username, auth_session_id = authorization.split(":")
-        users = load_users()
-        if username in users and users[username]["session_id"] == auth_session_id:
-            # Return the BRAND session ID stored in user data
-            return users[username].get("brand_session_id")
-        else:
-            raise HTTPException(status_code=401, detail="Invalid auth")
-    except:
+    username, auth_session_id = _parse_auth(authorization)
+    if username is None:
         raise HTTPException(status_code=401, detail="Invalid auth format")
+    
+    user = get_user(username)
+    if not user or user["session_id"] != auth_session_id:
+        raise HTTPException(status_code=401, detail="Invalid auth")
+    
+    return username, user
+
+def get_session_from_auth_dependency(authorization: str = Header(None)):
+    # Return the BRAND session ID stored in user data
+    _, user = _authenticate(authorization)
+    return user.get("brand_session_id")
 
 # ========== REQUEST MODELS ==========
 class AuthRequest(BaseModel):
@@ -177,6 +477,8 @@ class FullBrandKitRequest(BaseModel):
     email_type: Optional[str] = None
     email_topic: Optional[str] = None
     retry_all: bool = False
+    # Return before the logo image is ready; poll session-status for has_logo_image
+    async_logo: bool = False
 
 class NameAvailabilityRequest(BaseModel):
     names: List[str]
@@ -206,35 +508,28 @@ def logout(request: AuthRequest):
 
 # ========== INTAKE ENDPOINT ==========
 @app.post("/api/intake")
-def process_intake(answers: IntakeAnswers, authorization: str = Header(None)):
-    if not authorization:
-        raise HTTPException(status_code=401, detail="No auth header")
-    
-    try:
-        username, auth_session_id = authorization.split(":")
-        users = load_users()
-        
-        if username not in users or users[username]["session_id"] != auth_session_id:
-            raise HTTPException(status_code=401, detail="Invalid auth")
-        
-        # Check if user already has a brand session
-        if users[username].get("brand_session_id") and users[username]["brand_session_id"] in brand_sessions:
-            session_id = users[username]["brand_session_id"]
-            session = brand_sessions[session_id]
-            print(f"Using existing session: {session_id}")
-        else:
-            # Create new brand session for this user
-            session_id = str(uuid.uuid4())
-            users[username]["brand_session_id"] = session_id
-            save_users(users)
-            print(f"Created new session: {session_id}")
-        
-    except Exception as e:
-        raise HTTPException(status_code=401, detail=f"Auth error: {str(e)}")
+async def process_intake(answers: IntakeAnswers, authorization: str = Header(None)):
+    username, user = _authenticate(authorization)
     
-    config = extract_brand_config(answers.answers)
-    
-    # Create or update session
+    # Check if user already has a brand session
+    if user.get("brand_session_id") and user["brand_session_id"] in brand_sessions:
+        session_id = user["brand_session_id"]
+        print(f"Using existing session: {session_id}")
+    else:
+        # Create new brand session for this user
+        session_id = str(uuid.uuid4())
+        await asyncio.to_thread(set_brand_session_id, username, session_id)
+        print(f"Created new session: {session_id}")
+    
+    config = await extract_brand_config(answers.answers)
+    
+    # Create or update session; the new dict restarts at version 1, so drop
+    # anything cached against the old one
+    _COMPLETE_AT_VERSION.pop(session_id, None)
+    _BRAND_DATA_CACHE.pop(session_id, None)
+    _BRAND_DATA_JSON_CACHE.pop(session_id, None)
+    _LOGO_CACHE.pop(session_id, None)
+    _STATUS_CACHE.pop(session_id, None)
     brand_sessions[session_id] = {
         "industry": config.industry,
         "target_audience": config.target_audience,
@@ -249,7 +544,7 @@ def process_intake(answers: IntakeAnswers, authorization: str = Header(None)):
         "brand_name": None,
         "tagline": None,
         "logo_prompt": None,
-        "logo_image": None,
+        "logo_image_path": None,
         "color_palette": None,
         "color_palette_hex": None,
         "color_palette_primary": None,
@@ -258,175 +553,207 @@ def process_intake(answers: IntakeAnswers, authorization: str = Header(None)):
         "social_post": None,
         "email": None,
         
-        "chat_history": [],
+        "chat_history": new_chat_history(),
         "version": 1,
         
-        "history": {
-            "brand_names": [],
-            "taglines": [],
-            "product_descriptions": [],
-            "social_posts": [],
-            "emails": [],
-            "color_palettes": [],
-            "summaries": [],
-            "logo_prompts": []
-        }
+        "history": new_history()
     }
     
-    save_sessions()
+    schedule_save(session_id)
     return {
         "session_id": session_id,
         "config": config.dict(),
         "message": "Brand session created successfully."
     }
 
+# ========== SESSION HISTORY ==========
+# Per-field cap on stored generations; retries only ever look at the last
+# _HISTORY_EXCLUDE of them
+_HISTORY_MAX = 50
+_HISTORY_EXCLUDE = 20
+_HISTORY_KEYS = (
+    "brand_names", "taglines", "product_descriptions", "social_posts",
+    "emails", "color_palettes", "summaries", "logo_prompts"
+)
+
+def new_history(history=None):
+    """Per-field bounded deques; older entries drop off as new ones are pushed."""
+    history = history or {}
+    return {key: deque(history.get(key, ()), maxlen=_HISTORY_MAX) for key in _HISTORY_KEYS}
+
+def _push_history(session, key, *values):
+    session["history"][key].extend(values)
+
+def _recent_history(session, key):
+    """The last _HISTORY_EXCLUDE entries of a history field, oldest first."""
+    items = session["history"][key]
+    return list(islice(items, max(0, len(items) - _HISTORY_EXCLUDE), None))
+
 # ========== BRAND COMPLETENESS ORCHESTRATOR ==========
-def ensure_brand_completeness(session, session_id):
+# session_id -> version at which the session was last known to be complete
+_COMPLETE_AT_VERSION = {}
+
+async def ensure_brand_completeness(session, session_id):
     """
     Checks if all required brand elements exist.
     If missing, calls existing generators to create them.
+    When more than one element is missing they are generated together
+    in a single combined completion.
     Returns True if any generation was triggered.
     """
-    generated = False
-    
-    # Brand name is required for everything else
-    if not session.get("brand_name"):
+    if _COMPLETE_AT_VERSION.get(session_id) == session["version"]:
+        return False
+
+    need_name = not session.get("brand_name")
+    need_tagline = not session.get("tagline")
+    need_logo_prompt = not session.get("logo_prompt")
+    need_palette = not session.get("color_palette")
+
+    missing = [need_name, need_tagline, need_logo_prompt, need_palette].count(True)
+    if missing == 0:
+        _COMPLETE_AT_VERSION[session_id] = session["version"]
+        return False
+
+    if need_name:
         print("⚠️ Brand name missing, generating...")
-        names = generate_brand_names(
+    if need_tagline:
+        print("⚠️ Tagline missing, generating...")
+    if need_logo_prompt:
+        print("⚠️ Logo prompt missing, generating...")
+    if need_palette:
+        print("⚠️ Color palette missing, generating...")
+
+    if missing > 1:
+        bundle = await generate_brand_bundle(
+            industry=session["industry"],
+            keywords=session["keywords"],
+            tone=session["tone"],
+            brand_name=None if need_name else session["brand_name"]
+        )
+        names = bundle["names"]
+        taglines_list = bundle["taglines"]
+        logo_prompt = bundle["logo_prompt"]
+        palette_result = bundle["palette"]
+    elif need_name:
+        names = await generate_brand_names(
             industry=session["industry"],
             keywords=session["keywords"],
             tone=session["tone"],
             exclude=None
         )
-        if names:
-            session["history"]["brand_names"].extend(names)
-            session["brand_name"] = names[0]
-            session["version"] += 1
-            generated = True
-    
-    # Tagline
-    if not session.get("tagline") and session.get("brand_name"):
-        print("⚠️ Tagline missing, generating...")
-        tagline_result = generate_tagline(
+    elif need_tagline:
+        tagline_result = await generate_tagline(
             brand_name=session["brand_name"],
             industry=session["industry"],
             tone=session["tone"],
             exclude=None
         )
-        
-        # Store the full result in history
-        session["history"]["taglines"].append(tagline_result)
-        
-        # Simple parsing: take first line or first sentence
-        lines = tagline_result.split('\n')
-        first_tagline = None
-        
-        # Try to find first numbered or bullet item
-        for line in lines:
-            line = line.strip()
-            if line and (line[0].isdigit() or line[0] in ['•', '-', '*']):
-                # Clean up the line
-                if '.' in line and line[0].isdigit():
-                    first_tagline = line.split('.', 1)[1].strip()
-                else:
-                    first_tagline = line.lstrip('0123456789.•-* ').strip()
-                break
-        
-        # If no numbered items, take first non-empty line
-        if not first_tagline:
-            for line in lines:
-                if line.strip():
-                    first_tagline = line.strip()
-                    break
-        
-        # Fallback to first 50 chars
-        if not first_tagline:
-            first_tagline = tagline_result[:50] + '...' if len(tagline_result) > 50 else tagline_result
-        
-        session["tagline"] = first_tagline
-        session["version"] += 1
-        generated = True
-    
-    # Logo prompt (image generation is optional, but prompt is needed)
-    if not session.get("logo_prompt") and session.get("brand_name"):
-        print("⚠️ Logo prompt missing, generating...")
-        logo_prompt = generate_logo_prompt(
+        taglines_list = tagline_result.get("taglines", [])
+    elif need_logo_prompt:
+        logo_prompt = await generate_logo_prompt(
             brand_name=session["brand_name"],
             industry=session["industry"],
             keywords=session["keywords"],
             exclude=None
         )
-        session["history"]["logo_prompts"].append(logo_prompt)
-        session["logo_prompt"] = logo_prompt
-        session["version"] += 1
-        generated = True
-    
-    # Color palette
-    if not session.get("color_palette") and session.get("brand_name"):
-        print("⚠️ Color palette missing, generating...")
-        palette_result = get_color_palette(
+    else:
+        palette_result = await get_color_palette(
             tone=session["tone"],
             industry=session["industry"],
             brand_name=session["brand_name"],
             exclude=None
         )
-        
-        session["history"]["color_palettes"].append(palette_result["full_description"])
+
+    # Brand name is required for everything else
+    if need_name:
+        if not names:
+            return False
+        _push_history(session, "brand_names", *names)
+        session["brand_name"] = names[0]
+        session["version"] += 1
+
+    # Tagline
+    if need_tagline:
+        _push_history(session, "taglines", json.dumps({"taglines": taglines_list}))
+        session["tagline"] = taglines_list[0] if taglines_list else "Tagline pending"
+        session["version"] += 1
+
+    # Logo prompt (image generation is optional, but prompt is needed)
+    if need_logo_prompt:
+        _push_history(session, "logo_prompts", logo_prompt)
+        session["logo_prompt"] = logo_prompt
+        session["version"] += 1
+
+    # Color palette
+    if need_palette:
+        _push_history(session, "color_palettes", palette_result["full_description"])
         session["color_palette"] = palette_result["full_description"]
         session["color_palette_hex"] = palette_result["hex_codes"]
         session["color_palette_primary"] = palette_result["primary"]
         session["color_palette_secondary"] = palette_result["secondary"]
         session["version"] += 1
-        generated = True
-    
-    if generated:
-        save_sessions()
-    
-    return generated
+
+    _COMPLETE_AT_VERSION[session_id] = session["version"]
+    schedule_save(session_id)
+    return True
 
 # ========== SESSION TO BRAND DATA MAPPER ==========
-def map_session_to_brand_data(session):
+# Primary, secondary and accent used when the session has no palette
+_DEFAULT_COLORS = ("#0d1117", "#161b22", "#f97316")
+# Body text colour; every palette sets a dark background
+_TEXT_COLOR = "#e8edf3"
+# A bulleted line in a product description; the group is the bullet text
+_FEATURE_RE = re.compile(r'^[ \t]*[•\-*][ \t]*(.+?)[ \t\r]*$', re.M)
+# Filler features; shared read-only across every mapped brand_data
+_DEFAULT_FEATURES = tuple(
+    {
+        "title": f"Capability {i+1}",
+        "description": "Powered by our innovative approach and deep industry expertise."
+    }
+    for i in range(3)
+)
+
+# session_id -> (version, brand_data) for recently rendered sessions;
+# replaced whenever the version changes and dropped when a new logo is
+# stored. Bounded like _LOGO_CACHE since each entry embeds the logo
+_BRAND_DATA_CACHE = LRUCache(maxsize=64)
+
+def map_session_to_brand_data(session, session_id=None, logo_image_base64=""):
     """
     Transforms flat session storage into nested template format.
     No session structure modification.
+    logo_image_base64 is the stored logo, as returned by load_logo_base64.
+    When session_id is given the result is cached until the session's
+    version or logo changes; callers must not mutate it.
     """
+    if session_id is not None:
+        cached = _BRAND_DATA_CACHE.get(session_id)
+        if cached and cached[0] == session.get("version", 1):
+            return cached[1]
+
     
-    # Get color palette - handle both old and new format
-    if session.get("color_palette_hex"):
-        primary = session.get("color_palette_primary", session["color_palette_hex"][0] if session["color_palette_hex"] else "#0d1117")
-        secondary = session.get("color_palette_secondary", session["color_palette_hex"][1] if len(session["color_palette_hex"]) > 1 else "#161b22")
-        accent = session["color_palette_hex"][2] if len(session["color_palette_hex"]) > 2 else (session["color_palette_hex"][0] if session["color_palette_hex"] else "#f97316")
-    else:
-        # Fallback defaults
-        primary = "#0d1117"
-        secondary = "#161b22"
-        accent = "#f97316"
+    # Get color palette - handle both old and new format; missing slots
+    # fall back to the defaults
+    hex_codes = tuple(session.get("color_palette_hex") or ())[:3]
+    primary, secondary, accent = hex_codes + _DEFAULT_COLORS[len(hex_codes):]
+    primary = session.get("color_palette_primary") or primary
+    secondary = session.get("color_palette_secondary") or secondary
     
     background = primary
-    text_color = "#e8edf3"
     
     # Extract target audience segments
     target_audience = session.get("target_audience", "Professionals")
     
     # Get features from session or create defaults
-    features = []
-    if session.get("product_description"):
-        # Try to extract features from product description (simple split)
-        desc_lines = session["product_description"].split('\n')
-        feature_lines = [l for l in desc_lines if l.strip() and ('•' in l or '-' in l or 'feature' in l.lower())][:3]
-        
-        for i, line in enumerate(feature_lines[:3]):
-            features.append({
-                "title": f"Feature {i+1}",
-                "description": line.replace('•', '').replace('-', '').strip()
-            })
+    # Try to extract features from the product description's bullet lines
+    bullets = _FEATURE_RE.findall(session.get("product_description") or "")[:3]
+    features = [
+        {"title": f"Feature {i+1}", "description": bullet}
+        for i, bullet in enumerate(bullets)
+    ]
     
     # Ensure at least 3 features
-    while len(features) < 3:
-        features.append({
-            "title": f"Capability {len(features)+1}",
-            "description": "Powered by our innovative approach and deep industry expertise."
-        })
+    features.extend(_DEFAULT_FEATURES[len(features):])
     
     # Build the nested structure
     brand_data = {
@@ -444,12 +771,12 @@ def map_session_to_brand_data(session):
             "secondary_color": secondary,
             "accent_color": accent,
             "background_color": background,
-            "text_color": text_color
+            "text_color": _TEXT_COLOR
         },
         
         "logo": {
             "logo_prompt": session.get("logo_prompt", "Abstract brand mark"),
-            "logo_image_base64": session.get("logo_image", "")
+            "logo_image_base64": logo_image_base64
         },
         
         "content": {
@@ -467,29 +794,26 @@ def map_session_to_brand_data(session):
         }
     }
     
+    if session_id is not None:
+        _BRAND_DATA_CACHE[session_id] = (session.get("version", 1), brand_data)
+    
     return brand_data
 
 # ========== TEMPLATE INJECTOR ==========
-def inject_brand_data_into_template(template_html, brand_data):
+def split_template(template_html):
     """
-    Replaces the BRAND_DATA object in template with our generated data.
-    Uses string replace instead of regex to avoid Unicode escape issues.
-    Returns complete HTML string.
+    Locates the BRAND_DATA object in the template and returns the text
+    before and after it, or (None, None) if it can't be found.
+    Uses string scanning instead of regex to avoid Unicode escape issues.
     """
-    import json
-    
-    # Convert brand_data to JSON string with proper formatting
-    brand_data_json = json.dumps(brand_data, indent=2)
-    
     # Find the exact marker in the template
     marker_start = "const BRAND_DATA = {"
-    marker_end = "};"
     
     # Find the position of the marker
     start_idx = template_html.find(marker_start)
     if start_idx == -1:
         print("⚠️ BRAND_DATA marker not found in template")
-        return template_html
+        return None, None
     
     # Find the end of the BRAND_DATA object
     # Look for the closing brace after the start
@@ -521,36 +845,87 @@ def inject_brand_data_into_template(template_html, brand_data):
     
     if end_idx == -1:
         print("⚠️ Could not find end of BRAND_DATA object")
-        return template_html
+        return None, None
     
-    # Extract the part before and after
-    before = template_html[:start_idx]
-    after = template_html[end_idx:]
+    return template_html[:start_idx], template_html[end_idx:]
+
+# session_id -> (brand_data, serialized brand_data) for recently rendered
+# sessions; reused while the mapper keeps returning the same cached
+# brand_data object. Bounded like _LOGO_CACHE since each entry embeds the logo
+_BRAND_DATA_JSON_CACHE = LRUCache(maxsize=64)
+
+def serialize_brand_data(brand_data, session_id=None):
+    if session_id is not None:
+        cached = _BRAND_DATA_JSON_CACHE.get(session_id)
+        if cached and cached[0] is brand_data:
+            return cached[1]
     
-    # Construct the new HTML with injected data
-    new_marker = f"const BRAND_DATA = {brand_data_json};"
-    injected_html = before + new_marker + after
+    brand_data_json = orjson.dumps(brand_data)
+    if session_id is not None:
+        _BRAND_DATA_JSON_CACHE[session_id] = (brand_data, brand_data_json)
+    return brand_data_json
+
+def inject_brand_data_into_template(brand_data_json):
+    """
+    Replaces the BRAND_DATA object in the loaded template with our
+    serialized generated data. Returns the page as a tuple of byte chunks
+    to be streamed in order, so it is never joined into one buffer.
+    """
+    if TEMPLATE_PREFIX is None:
+        return (TEMPLATE_HTML.encode("utf-8"),)
     
-    return injected_html
+    return (TEMPLATE_PREFIX, b"const BRAND_DATA = ", brand_data_json, b";", TEMPLATE_SUFFIX)
 
 # ========== BRAND GENERATION ENDPOINTS ==========
-@app.post("/api/generate-brand")
-def generate_brand_from_session(
-    request: GenerateBrandFromSession,
-    authorization: str = Header(None)
-):
+def _resolve_session(authorization, require_brand_name=False):
+    """
+    Returns (session_id, session, None) for the caller's brand session, or
+    (None, None, error) with the error dict the endpoint should return.
+    """
     session_id = get_session_from_auth_dependency(authorization)
     if not session_id:
-        return {"error": "No active brand session. Please complete intake first."}
+        return None, None, {"error": "No active brand session. Please complete intake first."}
     
     session = brand_sessions.get(session_id)
-
     if not session:
-        return {"error": "Brand session not found"}
+        return None, None, {"error": "Brand session not found"}
+    
+    if require_brand_name and not session.get("brand_name"):
+        return None, None, {"error": "Generate brand name first"}
+    
+    return session_id, session, None
+
+async def _run_gen(session, session_id, request, history_key, gen_fn, result_field=None, **kwargs):
+    """
+    Shared body of the single-result generate endpoints: calls gen_fn with
+    kwargs plus the retry exclusions/feedback, records the result in the
+    history (and result_field), bumps the version and schedules a save.
+    """
+    result = await gen_fn(
+        **kwargs,
+        exclude=_recent_history(session, history_key) if request.retry else None,
+        feedback=request.feedback if request.retry else None
+    )
+    
+    _push_history(session, history_key, result)
+    if result_field:
+        session[result_field] = result
+    session["version"] += 1
+    schedule_save(session_id)
+    return result
+
+@app.post("/api/generate-brand")
+async def generate_brand_from_session(
+    request: GenerateBrandFromSession,
+    authorization: str = Header(None)
+):
+    session_id, session, error = _resolve_session(authorization)
+    if error:
+        return error
 
-    exclude_list = session["history"]["brand_names"][-20:] if request.retry else None
+    exclude_list = _recent_history(session, "brand_names") if request.retry else None
 
-    result = generate_brand_names(
+    result = await generate_brand_names(
         industry=session["industry"],
         keywords=session["keywords"],
         tone=session["tone"],
@@ -558,10 +933,10 @@ def generate_brand_from_session(
         feedback=request.feedback if request.retry else None
     )
 
-    session["history"]["brand_names"].extend(result)
+    _push_history(session, "brand_names", *result)
     session["brand_name"] = result[0]
     session["version"] += 1
-    save_sessions()
+    schedule_save(session_id)
 
     return {
         "brand_names": result,
@@ -569,9 +944,55 @@ def generate_brand_from_session(
         "version": session["version"]
     }
 
+@app.post("/api/generate-brand-stream")
+async def generate_brand_stream_from_session(
+    request: GenerateBrandFromSession,
+    authorization: str = Header(None)
+):
+    """
+    Server-Sent Events version of /api/generate-brand: each name is sent
+    as soon as it is generated, followed by a final "done" event once the
+    session has been updated.
+    """
+    session_id, session, error = _resolve_session(authorization)
+    if error:
+        return error
+
+    exclude_list = _recent_history(session, "brand_names") if request.retry else None
+
+    async def events():
+        names = []
+        async for name in stream_brand_names(
+            industry=session["industry"],
+            keywords=session["keywords"],
+            tone=session["tone"],
+            exclude=exclude_list,
+            feedback=request.feedback if request.retry else None
+        ):
+            if name in names:
+                continue
+            names.append(name)
+            yield f"data: {orjson.dumps({'brand_name': name}).decode('utf-8')}\n\n"
+
+        if names:
+            _push_history(session, "brand_names", *names)
+            session["brand_name"] = names[0]
+            session["version"] += 1
+            schedule_save(session_id)
+
+        done = {
+            "done": True,
+            "brand_names": names,
+            "selected_brand_name": session["brand_name"],
+            "version": session["version"]
+        }
+        yield f"data: {orjson.dumps(done).decode('utf-8')}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 @app.post("/api/generate-content")
-def generate_content(request: ContentRequest):
-    result = generate_marketing_content(
+async def generate_content(request: ContentRequest):
+    result = await generate_marketing_content(
         brand_description=request.brand_description,
         tone=request.tone,
         content_type=request.content_type
@@ -579,97 +1000,110 @@ def generate_content(request: ContentRequest):
     return {"content": result}
 
 @app.post("/api/analyze-sentiment")
-def sentiment_analysis(request: SentimentRequest):
-    result = analyze_sentiment(
+async def sentiment_analysis(request: SentimentRequest):
+    result = await analyze_sentiment(
         text=request.text,
         brand_tone=request.brand_tone
     )
     return {"analysis": result}
 
 @app.post("/api/chat")
-def chat(request: ChatRequest):
-    result = chat_with_ai(request.user_message)
+async def chat(request: ChatRequest):
+    result = await chat_with_ai(request.user_message)
     return {"response": result}
 
 @app.post("/api/generate-logo")
-def generate_logo_from_session(
+async def generate_logo_from_session(
     request: LogoSessionRequest,
     authorization: str = Header(None)
 ):
-    session_id = get_session_from_auth_dependency(authorization)
-    if not session_id:
-        return {"error": "No active brand session. Please complete intake first."}
-    
-    session = brand_sessions.get(session_id)
-
-    if not session:
-        return {"error": "Brand session not found"}
-
-    if not session.get("brand_name"):
-        return {"error": "Generate brand name first"}
+    session_id, session, error = _resolve_session(authorization, require_brand_name=True)
+    if error:
+        return error
 
-    exclude_list = session["history"]["logo_prompts"][-20:] if request.retry else None
+    exclude_list = _recent_history(session, "logo_prompts") if request.retry else None
 
-    # Generate 3 different logo style prompts
-    style_prompts = []
+    # Generate 3 different logo style prompts concurrently
     styles = ["minimal", "bold", "elegant"]
     
-    for style in styles:
-        style_prompt = generate_logo_prompt(
+    prompts = await asyncio.gather(*(
+        generate_logo_prompt(
             brand_name=session["brand_name"],
             industry=session["industry"],
             keywords=session["keywords"] + f", {style} style",
             exclude=exclude_list,
             feedback=f"Make it {style}" + (f" - {request.feedback}" if request.feedback else "")
         )
-        style_prompts.append({
+        for style in styles
+    ))
+    style_prompts = [
+        {
             "style": style.capitalize(),
             "prompt": style_prompt,
             "image": None
-        })
+        }
+        for style, style_prompt in zip(styles, prompts)
+    ]
     
     # Store only the first prompt in history (to avoid bloat)
-    session["history"]["logo_prompts"].append(style_prompts[0]["prompt"])
+    _push_history(session, "logo_prompts", style_prompts[0]["prompt"])
     session["logo_prompt"] = style_prompts[0]["prompt"]
     session["version"] += 1
-    save_sessions()
+    schedule_save(session_id)
 
     # Try to generate image for the first style
     try:
-        image_base64 = generate_logo_image(style_prompts[0]["prompt"])
-        style_prompts[0]["image"] = image_base64
-        session["logo_image"] = image_base64
-        save_sessions()
+        style_prompts[0]["image"] = await generate_session_logo(session, session_id, style_prompts[0]["prompt"])
     except Exception as e:
         print(f"⚠️ Logo image generation failed: {e}")
 
-    return {
+    # Returned directly so the base64 image skips jsonable_encoder
+    return ORJSONResponse({
         "brand_name": session["brand_name"],
         "logos": style_prompts,  # Return all 3 variations
         "version": session["version"]
-    }
+    })
+
+
+@app.get("/api/logo-image")
+async def logo_image_from_session(authorization: str = Header(None)):
+    """
+    Returns the session's logo as a PNG body instead of base64 in JSON.
+    Serves the stored file when there is one, otherwise generates it
+    from the current logo prompt.
+    """
+    session_id, session, error = _resolve_session(authorization)
+    if error:
+        return error
+
+    if not session.get("logo_prompt"):
+        return {"error": "Generate logo first"}
+
+    path = session.get("logo_image_path")
+    if path and os.path.exists(path):
+        return FileResponse(path, media_type="image/png")
+
+    try:
+        image_bytes = await asyncio.to_thread(generate_logo_image_bytes, session["logo_prompt"])
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Logo image generation failed: {e}")
+    await store_logo(session, session_id, image_bytes)
+
+    return StreamingResponse(BytesIO(image_bytes), media_type="image/png")
 
 
 @app.post("/api/get-colors-from-session")
-def color_palette_from_session(
+async def color_palette_from_session(
     request: ColorFromSessionRequest,
     authorization: str = Header(None)
 ):
-    session_id = get_session_from_auth_dependency(authorization)
-    if not session_id:
-        return {"error": "No active brand session. Please complete intake first."}
-    
-    session = brand_sessions.get(session_id)
-
-    if not session:
-        return {"error": "Brand session not found"}
-
-    if not session.get("brand_name"):
-        return {"error": "Generate brand name first"}
+    session_id, session, error = _resolve_session(authorization, require_brand_name=True)
+    if error:
+        return error
 
-    exclude_list = session["history"]["color_palettes"][-20:] if request.retry else None
+    exclude_list = _recent_history(session, "color_palettes") if request.retry else None
 
-    result = get_color_palette(
+    result = await get_color_palette(
         tone=session["tone"],
         industry=session["industry"],
         brand_name=session["brand_name"],
@@ -678,13 +1112,13 @@ def color_palette_from_session(
     )
 
     # Store both the full description and parsed HEX codes
-    session["history"]["color_palettes"].append(result["full_description"])
+    _push_history(session, "color_palettes", result["full_description"])
     session["color_palette"] = result["full_description"]
     session["color_palette_hex"] = result["hex_codes"]  # Store HEX codes separately
     session["color_palette_primary"] = result["primary"]
     session["color_palette_secondary"] = result["secondary"]
     session["version"] += 1
-    save_sessions()
+    schedule_save(session_id)
 
     return {
         "brand_name": session["brand_name"],
@@ -696,8 +1130,8 @@ def color_palette_from_session(
     }
 
 @app.post("/api/get-colors")
-def color_palette(request: ColorRequest):
-    result = get_color_palette(
+async def color_palette(request: ColorRequest):
+    result = await get_color_palette(
         tone=request.tone,
         industry=request.industry,
         brand_name=None,
@@ -713,29 +1147,21 @@ def color_palette(request: ColorRequest):
 @app.post("/api/transcribe-voice")
 async def transcribe_voice(file: UploadFile = File(...)):
     audio_bytes = await file.read()
-    result = transcribe_audio(audio_bytes)
+    result = await transcribe_audio(audio_bytes, file.filename or "audio.wav")
     return {"transcription": result}
 
 @app.post("/api/generate-tagline")
-def generate_tagline_from_session(
+async def generate_tagline_from_session(
     request: TaglineRequest,
     authorization: str = Header(None)
 ):
-    session_id = get_session_from_auth_dependency(authorization)
-    if not session_id:
-        return {"error": "No active brand session. Please complete intake first."}
-    
-    session = brand_sessions.get(session_id)
-
-    if not session:
-        return {"error": "Brand session not found"}
-
-    if not session.get("brand_name"):
-        return {"error": "Generate brand name first"}
+    session_id, session, error = _resolve_session(authorization, require_brand_name=True)
+    if error:
+        return error
 
-    exclude_list = session["history"]["taglines"][-20:] if request.retry else None
+    exclude_list = _recent_history(session, "taglines") if request.retry else None
 
-    result = generate_tagline(
+    result = await generate_tagline(
         brand_name=session["brand_name"],
         industry=session["industry"],
         tone=session["tone"],
@@ -747,11 +1173,11 @@ def generate_tagline_from_session(
     taglines_list = result.get("taglines", [])
     
     # Store the full JSON in history
-    session["history"]["taglines"].append(json.dumps(result))
+    _push_history(session, "taglines", json.dumps(result))
     # Store the first one as the selected tagline
     session["tagline"] = taglines_list[0] if taglines_list else "Tagline pending"
     session["version"] += 1
-    save_sessions()
+    schedule_save(session_id)
 
     return {
         "brand_name": session["brand_name"],
@@ -762,39 +1188,24 @@ def generate_tagline_from_session(
 
 
 @app.post("/api/generate-product-description")
-def generate_product_from_session(
+async def generate_product_from_session(
     request: ProductDescriptionRequest,
     authorization: str = Header(None)
 ):
-    session_id = get_session_from_auth_dependency(authorization)
-    if not session_id:
-        return {"error": "No active brand session. Please complete intake first."}
-    
-    session = brand_sessions.get(session_id)
-
-    if not session:
-        return {"error": "Brand session not found"}
-
-    if not session.get("brand_name"):
-        return {"error": "Generate brand name first"}
-
-    exclude_list = session["history"]["product_descriptions"][-20:] if request.retry else None
+    session_id, session, error = _resolve_session(authorization, require_brand_name=True)
+    if error:
+        return error
 
-    result = generate_product_description(
+    result = await _run_gen(
+        session, session_id, request, "product_descriptions", generate_product_description,
+        result_field="product_description",
         brand_name=session["brand_name"],
         industry=session["industry"],
         tone=session["tone"],
         product_name=request.product_name,
-        product_features=request.product_features,
-        exclude=exclude_list,
-        feedback=request.feedback if request.retry else None
+        product_features=request.product_features
     )
 
-    session["history"]["product_descriptions"].append(result)
-    session["product_description"] = result
-    session["version"] += 1
-    save_sessions()
-
     return {
         "brand_name": session["brand_name"],
         "product_description": result,
@@ -802,39 +1213,24 @@ def generate_product_from_session(
     }
 
 @app.post("/api/generate-social-post")
-def generate_social_from_session(
+async def generate_social_from_session(
     request: SocialPostRequest,
     authorization: str = Header(None)
 ):
-    session_id = get_session_from_auth_dependency(authorization)
-    if not session_id:
-        return {"error": "No active brand session. Please complete intake first."}
-    
-    session = brand_sessions.get(session_id)
+    session_id, session, error = _resolve_session(authorization, require_brand_name=True)
+    if error:
+        return error
 
-    if not session:
-        return {"error": "Brand session not found"}
-
-    if not session.get("brand_name"):
-        return {"error": "Generate brand name first"}
-
-    exclude_list = session["history"]["social_posts"][-20:] if request.retry else None
-
-    result = generate_social_post(
+    result = await _run_gen(
+        session, session_id, request, "social_posts", generate_social_post,
+        result_field="social_post",
         brand_name=session["brand_name"],
         industry=session["industry"],
         tone=session["tone"],
         platform=request.platform,
-        topic=request.topic,
-        exclude=exclude_list,
-        feedback=request.feedback if request.retry else None
+        topic=request.topic
     )
 
-    session["history"]["social_posts"].append(result)
-    session["social_post"] = result
-    session["version"] += 1
-    save_sessions()
-
     return {
         "brand_name": session["brand_name"],
         "social_post": result,
@@ -842,39 +1238,24 @@ def generate_social_from_session(
     }
 
 @app.post("/api/generate-email")
-def generate_email_from_session(
+async def generate_email_from_session(
     request: EmailRequest,
     authorization: str = Header(None)
 ):
-    session_id = get_session_from_auth_dependency(authorization)
-    if not session_id:
-        return {"error": "No active brand session. Please complete intake first."}
-    
-    session = brand_sessions.get(session_id)
-
-    if not session:
-        return {"error": "Brand session not found"}
-
-    if not session.get("brand_name"):
-        return {"error": "Generate brand name first"}
+    session_id, session, error = _resolve_session(authorization, require_brand_name=True)
+    if error:
+        return error
 
-    exclude_list = session["history"]["emails"][-20:] if request.retry else None
-
-    result = generate_email(
+    result = await _run_gen(
+        session, session_id, request, "emails", generate_email,
+        result_field="email",
         brand_name=session["brand_name"],
         industry=session["industry"],
         tone=session["tone"],
         email_type=request.email_type,
-        subject_topic=request.topic,
-        exclude=exclude_list,
-        feedback=request.feedback if request.retry else None
+        subject_topic=request.topic
     )
 
-    session["history"]["emails"].append(result)
-    session["email"] = result
-    session["version"] += 1
-    save_sessions()
-
     return {
         "brand_name": session["brand_name"],
         "email": result,
@@ -882,36 +1263,21 @@ def generate_email_from_session(
     }
 
 @app.post("/api/summarize-text")
-def summarize_from_session(
+async def summarize_from_session(
     request: SummarizeRequest,
     authorization: str = Header(None)
 ):
-    session_id = get_session_from_auth_dependency(authorization)
-    if not session_id:
-        return {"error": "No active brand session. Please complete intake first."}
-    
-    session = brand_sessions.get(session_id)
+    session_id, session, error = _resolve_session(authorization, require_brand_name=True)
+    if error:
+        return error
 
-    if not session:
-        return {"error": "Brand session not found"}
-
-    if not session.get("brand_name"):
-        return {"error": "Generate brand name first"}
-
-    exclude_list = session["history"]["summaries"][-20:] if request.retry else None
-
-    result = summarize_text(
+    result = await _run_gen(
+        session, session_id, request, "summaries", summarize_text,
         brand_name=session["brand_name"],
         tone=session["tone"],
-        text=request.text,
-        exclude=exclude_list,
-        feedback=request.feedback if request.retry else None
+        text=request.text
     )
 
-    session["history"]["summaries"].append(result)
-    session["version"] += 1
-    save_sessions()
-
     return {
         "brand_name": session["brand_name"],
         "summary": result,
@@ -919,26 +1285,38 @@ def summarize_from_session(
     }
 
 @app.post("/api/analyze-competitor")
-def analyze_competitor(request: CompetitorAnalysisRequest):
-    result = generate_competitor_analysis(request.url)
-    return result
+async def analyze_competitor(request: CompetitorAnalysisRequest):
+    result = await generate_competitor_analysis(request.url)
+    return ORJSONResponse(result)
+
+# session_id -> ((version, chat length, logo path, logo error), serialized status body)
+_STATUS_CACHE = {}
 
 @app.get("/api/session-status")
 def session_status(authorization: str = Header(None)):
-    session_id = get_session_from_auth_dependency(authorization)
-    if not session_id:
-        return {"error": "No active brand session. Please complete intake first."}
-    
-    session = brand_sessions.get(session_id)
-
-    if not session:
-        return {"error": "Brand session not found"}
+    session_id, session, error = _resolve_session(authorization)
+    if error:
+        return error
+
+    # Chat turns and background logo images don't bump the version, so
+    # they are part of the key
+    key = (
+        session.get("version", 1),
+        len(session.get("chat_history", [])),
+        session.get("logo_image_path"),
+        session.get("logo_error")
+    )
+    cached = _STATUS_CACHE.get(session_id)
+    if cached and cached[0] == key:
+        return Response(content=cached[1], media_type="application/json")
 
-    return {
+    body = orjson.dumps({
         "session_id": session_id,
         "brand_name": session.get("brand_name"),
         "has_tagline": session.get("tagline") is not None,
         "has_logo": session.get("logo_prompt") is not None,
+        "has_logo_image": session.get("logo_image_path") is not None,
+        "logo_error": session.get("logo_error"),
         "has_color_palette": session.get("color_palette") is not None,
         "has_product_description": session.get("product_description") is not None,
         "has_social_post": session.get("social_post") is not None,
@@ -958,10 +1336,12 @@ def session_status(authorization: str = Header(None)):
             "summaries": len(session["history"]["summaries"]),
             "logo_prompts": len(session["history"]["logo_prompts"])
         }
-    }
+    })
+    _STATUS_CACHE[session_id] = (key, body)
+    return Response(content=body, media_type="application/json")
 
 @app.post("/api/chat-with-context")
-def chat_with_context_endpoint(
+async def chat_with_context_endpoint(
     request: ChatSessionRequest,
     authorization: str = Header(None)
 ):
@@ -974,8 +1354,8 @@ def chat_with_context_endpoint(
     if not session:
         return {"error": "Brand session not found"}
     
-    response = chat_with_context(session, request.message)
-    save_sessions()
+    response = await chat_with_context(session, request.message)
+    schedule_save(session_id)
     
     return {
         "response": response,
@@ -983,169 +1363,115 @@ def chat_with_context_endpoint(
     }
 
 @app.post("/api/generate-full-brand-kit")
-def generate_full_brand_kit(
+async def generate_full_brand_kit(
     request: FullBrandKitRequest,
     authorization: str = Header(None)
 ):
-    session_id = get_session_from_auth_dependency(authorization)
-    if not session_id:
-        return {"error": "No active brand session. Please complete intake first."}
-    
-    session = brand_sessions.get(session_id)
-
-    if not session:
-        return {"error": "Brand session not found"}
-
-    # ---------- BRAND NAME ----------
-    if not session.get("brand_name") or request.retry_all:
-        exclude = session["history"]["brand_names"][-20:] if request.retry_all else None
-
-        names = generate_brand_names(
-            industry=session["industry"],
-            keywords=session["keywords"],
-            tone=session["tone"],
-            exclude=exclude
-        )
-
-        session["history"]["brand_names"].extend(names)
-        session["brand_name"] = names[0]
-        session["version"] += 1
-
-    # ---------- TAGLINE ----------
-    exclude = session["history"]["taglines"][-20:] if request.retry_all else None
+    session_id, session, error = _resolve_session(authorization)
+    if error:
+        return error
+
+    # ---------- BRAND NAME / TAGLINE / LOGO / COLOR PALETTE / CONTENT ----------
+    # One combined completion instead of a round trip per artifact
+    need_name = not session.get("brand_name") or request.retry_all
+    want_product = bool(request.product_name and request.product_features)
+    want_social = bool(request.social_platform and request.social_topic)
+    want_email = bool(request.email_type and request.email_topic)
+
+    exclude = None
+    if request.retry_all:
+        exclude = {
+            "names": _recent_history(session, "brand_names"),
+            "taglines": _recent_history(session, "taglines"),
+            "logo_prompts": _recent_history(session, "logo_prompts"),
+            "palettes": _recent_history(session, "color_palettes"),
+            "product_descriptions": _recent_history(session, "product_descriptions"),
+            "social_posts": _recent_history(session, "social_posts"),
+            "emails": _recent_history(session, "emails")
+        }
 
-    tagline_result = generate_tagline(
-        brand_name=session["brand_name"],
+    bundle = await generate_brand_bundle(
         industry=session["industry"],
+        keywords=session["keywords"],
         tone=session["tone"],
-        exclude=exclude
+        brand_name=None if need_name else session["brand_name"],
+        exclude=exclude,
+        product={"name": request.product_name, "features": request.product_features} if want_product else None,
+        social={"platform": request.social_platform, "topic": request.social_topic} if want_social else None,
+        email={"type": request.email_type, "topic": request.email_topic} if want_email else None
     )
 
-    session["history"]["taglines"].append(tagline_result)
-    
-    # Simple parsing: take first line or first sentence
-    lines = tagline_result.split('\n')
-    first_tagline = None
-    
-    # Try to find first numbered or bullet item
-    for line in lines:
-        line = line.strip()
-        if line and (line[0].isdigit() or line[0] in ['•', '-', '*']):
-            if '.' in line and line[0].isdigit():
-                first_tagline = line.split('.', 1)[1].strip()
-            else:
-                first_tagline = line.lstrip('0123456789.•-* ').strip()
-            break
-    
-    # If no numbered items, take first non-empty line
-    if not first_tagline:
-        for line in lines:
-            if line.strip():
-                first_tagline = line.strip()
-                break
-    
-    # Fallback
-    if not first_tagline:
-        first_tagline = tagline_result[:50] + '...' if len(tagline_result) > 50 else tagline_result
-    
-    session["tagline"] = first_tagline
-    session["version"] += 1
-
-    # ---------- LOGO ----------
-    exclude = session["history"]["logo_prompts"][-20:] if request.retry_all else None
+    if need_name:
+        names = bundle["names"]
+        _push_history(session, "brand_names", *names)
+        session["brand_name"] = names[0]
 
-    logo_prompt = generate_logo_prompt(
-        brand_name=session["brand_name"],
-        industry=session["industry"],
-        keywords=session["keywords"],
-        exclude=exclude
-    )
+    # ---------- TAGLINE ----------
+    taglines_list = bundle["taglines"]
+    _push_history(session, "taglines", json.dumps({"taglines": taglines_list}))
+    session["tagline"] = taglines_list[0] if taglines_list else "Tagline pending"
 
-    session["history"]["logo_prompts"].append(logo_prompt)
+    # ---------- LOGO ----------
+    logo_prompt = bundle["logo_prompt"]
+    _push_history(session, "logo_prompts", logo_prompt)
     session["logo_prompt"] = logo_prompt
-    session["version"] += 1
 
-    logo_image = generate_logo_image(logo_prompt)
-    session["logo_image"] = logo_image
+    palette_result = bundle["palette"]
 
     # ---------- COLOR PALETTE ----------
-    exclude = session["history"]["color_palettes"][-20:] if request.retry_all else None
-
-    palette_result = get_color_palette(
-        tone=session["tone"],
-        industry=session["industry"],
-        brand_name=session["brand_name"],
-        exclude=exclude
-    )
-
-    session["history"]["color_palettes"].append(palette_result["full_description"])
+    _push_history(session, "color_palettes", palette_result["full_description"])
     session["color_palette"] = palette_result["full_description"]
     session["color_palette_hex"] = palette_result["hex_codes"]
     session["color_palette_primary"] = palette_result["primary"]
     session["color_palette_secondary"] = palette_result["secondary"]
-    session["version"] += 1
-
-    # ---------- OPTIONAL PRODUCT ----------
-    product_result = None
-    if request.product_name and request.product_features:
-        exclude = session["history"]["product_descriptions"][-20:] if request.retry_all else None
 
-        product_result = generate_product_description(
-            brand_name=session["brand_name"],
-            industry=session["industry"],
-            tone=session["tone"],
-            product_name=request.product_name,
-            product_features=request.product_features,
-            exclude=exclude
-        )
+    product_result = bundle["product_description"]
+    social_result = bundle["social_post"]
+    email_result = bundle["email"]
 
-        session["history"]["product_descriptions"].append(product_result)
+    # ---------- OPTIONAL PRODUCT ----------
+    if want_product:
+        _push_history(session, "product_descriptions", product_result)
         session["product_description"] = product_result
-        session["version"] += 1
 
     # ---------- OPTIONAL SOCIAL ----------
-    social_result = None
-    if request.social_platform and request.social_topic:
-        exclude = session["history"]["social_posts"][-20:] if request.retry_all else None
-
-        social_result = generate_social_post(
-            brand_name=session["brand_name"],
-            industry=session["industry"],
-            tone=session["tone"],
-            platform=request.social_platform,
-            topic=request.social_topic,
-            exclude=exclude
-        )
-
-        session["history"]["social_posts"].append(social_result)
+    if want_social:
+        _push_history(session, "social_posts", social_result)
         session["social_post"] = social_result
-        session["version"] += 1
 
     # ---------- OPTIONAL EMAIL ----------
-    email_result = None
-    if request.email_type and request.email_topic:
-        exclude = session["history"]["emails"][-20:] if request.retry_all else None
-
-        email_result = generate_email(
-            brand_name=session["brand_name"],
-            industry=session["industry"],
-            tone=session["tone"],
-            email_type=request.email_type,
-            subject_topic=request.email_topic,
-            exclude=exclude
-        )
-
-        session["history"]["emails"].append(email_result)
+    if want_email:
+        _push_history(session, "emails", email_result)
         session["email"] = email_result
-        session["version"] += 1
 
-    save_sessions()
+    # One bump for the whole kit, so version-keyed caches see a single
+    # change; done before the image call so a failed image can't leave
+    # the new text unsaved behind a stale version
+    session["version"] += 1
+    schedule_save(session_id)
+
+    if request.async_logo:
+        # The old image no longer matches the new prompt
+        session["logo_image_path"] = None
+        _LOGO_CACHE.pop(session_id, None)
+        _BRAND_DATA_CACHE.pop(session_id, None)
+        session.pop("logo_error", None)
+        start_background_logo(session, session_id, logo_prompt)
+        logo_image = None
+    else:
+        try:
+            logo_image = await generate_session_logo(session, session_id, logo_prompt)
+        except Exception as e:
+            print(f"⚠️ Logo image generation failed: {e}")
+            logo_image = None
 
-    return {
+    # Returned directly so the base64 image skips jsonable_encoder
+    return ORJSONResponse({
         "brand_name": session["brand_name"],
         "tagline": session["tagline"],
         "logo_prompt": logo_prompt,
         "logo_image_base64": logo_image,
+        "logo_pending": request.async_logo,
         "color_palette": session["color_palette"],
         "color_palette_hex": session["color_palette_hex"],
         "color_palette_primary": session["color_palette_primary"],
@@ -1154,40 +1480,33 @@ def generate_full_brand_kit(
         "social_post": social_result,
         "email": email_result,
         "version": session["version"]
-    }
+    })
 
 @app.post("/api/check-domain-availability")
-def check_domain_availability_endpoint(request: NameAvailabilityRequest):
-    results = []
+async def check_domain_availability_endpoint(request: NameAvailabilityRequest):
+    domains = [f"{name.lower().replace(' ', '')}.com" for name in request.names]
 
-    for name in request.names:
-        clean_name = name.lower().replace(" ", "")
-        domain = f"{clean_name}.com"
+    # All WHOIS lookups run concurrently
+    availability = await check_domain_availability_batch(domains)
 
-        available = check_domain_availability(domain)
-
-        results.append({
-            "name": name,
-            "domain": domain,
-            "available": available
-        })
-
-    return {"results": results}
+    return {"results": [
+        {"name": name, "domain": domain, "available": availability[domain]}
+        for name, domain in zip(request.names, domains)
+    ]}
 
 @app.post("/api/backup-sessions")
-def backup_sessions(authorization: str = Header(None)):
-    save_sessions()
-    
-    import datetime
-    backup_file = f"sessions_backup_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(backup_file, 'w') as f:
-        json.dump(brand_sessions, f, indent=2)
+async def backup_sessions(authorization: str = Header(None)):
+    backup_file = f"sessions_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+    async with _save_lock:
+        # Flush pending changes first so the store is current
+        await _write_dirty_sessions()
+        await asyncio.to_thread(session_store.backup_sessions, backup_file)
     
     return {"success": True, "backup_file": backup_file}
 
 # ========== NEW WEBSITE GENERATION ENDPOINT ==========
 @app.post("/generate-website", response_class=HTMLResponse)
-def generate_website(
+async def generate_website(
     request: GenerateWebsiteRequest,
     authorization: str = Header(None)
 ):
@@ -1195,9 +1514,10 @@ def generate_website(
     Generates a complete brand website by:
     1. Getting session from auth
     2. Ensuring all brand elements exist
-    3. Mapping to template format
-    4. Injecting into template
-    5. Returning HTML
+    3. Generating the logo image if missing
+    4. Mapping to template format
+    5. Injecting into template
+    5. Streaming the HTML
     """
     # 1. Get session
     session_id = get_session_from_auth_dependency(authorization)
@@ -1209,65 +1529,54 @@ def generate_website(
         return HTMLResponse(content="Session not found", status_code=404)
     
     # 2. Ensure completeness (auto-generate missing elements)
-    ensure_brand_completeness(session, session_id)
+    await ensure_brand_completeness(session, session_id)
     
-    # 3. Map to template format
-    brand_data = map_session_to_brand_data(session)
+    # 3. Generate logo image if missing, joining one already being generated
+    # in the background instead of starting a second; shielded so a client
+    # disconnect doesn't cancel it (failures are recorded as logo_error)
+    if session.get("logo_prompt") and not session.get("logo_image_path"):
+        await asyncio.shield(start_background_logo(session, session_id, session["logo_prompt"]))
     
-    # 4. Inject logo if available
-    if session.get("logo_prompt") and not session.get("logo_image"):
-        try:
-            logo_image = generate_logo_image(session["logo_prompt"])
-            session["logo_image"] = logo_image
-            brand_data["logo"]["logo_image_base64"] = logo_image
-            save_sessions()
-        except Exception as e:
-            print(f"⚠️ Logo generation failed: {e}")
-    elif session.get("logo_image"):
-        brand_data["logo"]["logo_image_base64"] = session["logo_image"]
+    # 4. Map to template format (includes the stored logo); both steps are
+    # cached until the session version or logo changes
+    logo_image_base64 = await load_logo_base64(session, session_id)
+    brand_data = map_session_to_brand_data(session, session_id, logo_image_base64)
+    brand_data_json = serialize_brand_data(brand_data, session_id)
     
     # 5. Inject into template
+    await refresh_template()
     if not TEMPLATE_HTML:
         return HTMLResponse(content="Template not loaded", status_code=500)
     
-    final_html = inject_brand_data_into_template(TEMPLATE_HTML, brand_data)
+    chunks = inject_brand_data_into_template(brand_data_json)
     
-    # 6. Return HTML response
-    return HTMLResponse(content=final_html)
+    # 6. Stream the HTML response
+    return StreamingResponse(iter(chunks), media_type="text/html")
 
 class CompetitorRequest(BaseModel):
     url: str
     depth: Optional[int] = 2
 
 @app.post("/api/analyze-competitor-standalone")
-def analyze_competitor_standalone(
+async def analyze_competitor_standalone(
     request: CompetitorRequest,
     authorization: str = Header(None)
 ):
     """
     Standalone competitor analysis - doesn't require brand session
     """
-    if not authorization:
-        raise HTTPException(status_code=401, detail="No auth header")
-    
-    try:
-        username, auth_session_id = authorization.split(":")
-        users = load_users()
-        if username not in users or users[username]["session_id"] != auth_session_id:
-            raise HTTPException(status_code=401, detail="Invalid auth")
-    except:
-        raise HTTPException(status_code=401, detail="Invalid auth format")
+    _authenticate(authorization)
     
     # Call the existing competitor analysis
-    result = generate_competitor_analysis(request.url)
+    result = await generate_competitor_analysis(request.url)
     
-    return result
+    return ORJSONResponse(result)
 
 class SetModeRequest(BaseModel):
     mode: str  # "full", "name", "logo", "tagline", "colors", "competitor"
 
 @app.post("/api/set-mode")
-def set_mode(
+async def set_mode(
     request: SetModeRequest,
     authorization: str = Header(None)
 ):
@@ -1280,6 +1589,6 @@ def set_mode(
         return {"error": "Session not found"}
     
     session["mode"] = request.mode
-    save_sessions()
+    schedule_save(session_id)
     
     return {"success": True, "mode": request.mode}
@@ -0,0 +1,102 @@
+import os
+import sqlite3
+import threading
+import time
+import orjson
+
+SESSIONS_DB = "sessions.db"
+# Older stores, imported once into SESSIONS_DB
+SESSIONS_DIR = "sessions"  # one JSON file per session
+SESSIONS_FILE = "sessions.json"  # single JSON file
+
+_DB = sqlite3.connect(SESSIONS_DB, check_same_thread=False)
+_LOCK = threading.Lock()
+
+
+def _read_legacy():
+    sessions = {}
+
+    if os.path.isdir(SESSIONS_DIR):
+        for filename in os.listdir(SESSIONS_DIR):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(SESSIONS_DIR, filename), 'rb') as f:
+                    sessions[filename[:-len(".json")]] = orjson.loads(f.read())
+            except Exception as e:
+                print(f"⚠️ Skipping unreadable session file {filename}: {e}")
+
+    if not sessions and os.path.exists(SESSIONS_FILE):
+        try:
+            with open(SESSIONS_FILE, 'rb') as f:
+                sessions = orjson.loads(f.read())
+        except Exception as e:
+            print(f"⚠️ Could not read {SESSIONS_FILE}: {e}")
+
+    return sessions
+
+
+def _init_db():
+    with _LOCK, _DB:
+        _DB.execute("PRAGMA journal_mode=WAL")
+        # WAL stays consistent on a crash without an fsync per commit
+        _DB.execute("PRAGMA synchronous=NORMAL")
+        _DB.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                version INTEGER,
+                updated_at REAL
+            )
+        """)
+        empty = _DB.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] == 0
+
+    if empty:
+        legacy = _read_legacy()
+        if legacy:
+            write_sessions([
+                (session_id, orjson.dumps(session), session.get("version", 1))
+                for session_id, session in legacy.items()
+            ])
+            print(f"Imported {len(legacy)} sessions into {SESSIONS_DB}")
+
+
+def load_sessions():
+    """Returns every stored session as {session_id: session dict}."""
+    with _LOCK:
+        rows = _DB.execute("SELECT session_id, data FROM sessions").fetchall()
+
+    sessions = {}
+    for session_id, data in rows:
+        try:
+            sessions[session_id] = orjson.loads(data)
+        except orjson.JSONDecodeError as e:
+            print(f"⚠️ Skipping unreadable session {session_id}: {e}")
+    return sessions
+
+
+def write_sessions(rows):
+    """Upserts (session_id, serialized session, version) rows in one transaction."""
+    if not rows:
+        return
+    now = time.time()
+    with _LOCK, _DB:
+        _DB.executemany(
+            "INSERT INTO sessions (session_id, data, version, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET "
+            "data = excluded.data, version = excluded.version, updated_at = excluded.updated_at",
+            [(session_id, data, version, now) for session_id, data, version in rows]
+        )
+
+
+def backup_sessions(path):
+    """Copies a consistent snapshot of the database to path."""
+    dest = sqlite3.connect(path)
+    try:
+        with _LOCK:
+            _DB.backup(dest)
+    finally:
+        dest.close()
+
+
+_init_db()